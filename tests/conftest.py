@@ -3,109 +3,189 @@ Pytest configuration and shared fixtures for n8n Visual Workflow Builder tests.
 """
 
 import asyncio
+import copy
+import os
+import time
+import uuid
 import pytest
 import pytest_asyncio
 from unittest.mock import Mock, AsyncMock
 from typing import Dict, Any
 
-# Import mock classes
-from tests.mocks.n8n_api_mock import N8nApiMock
-from tests.mocks.redis_mock import RedisMock
-from tests.mocks.websocket_mock import WebSocketMock
-from tests.mocks.external_services_mock import ExternalServiceMock
+# Import mock specs
+from tests.mocks._protocols import EventBusProtocol, StateManagerProtocol
 
 # Import test fixtures
+from tests.fixtures.frozen import freeze, thaw
+from tests.fixtures.ids import edge_id, node_id
 from tests.fixtures.sample_workflows import SIMPLE_WORKFLOW, COMPLEX_WORKFLOW
-from tests.fixtures.test_credentials import TEST_CREDENTIALS
+from tests.fixtures.test_credentials import VALID_CREDENTIALS
 from tests.fixtures.canvas_states import EMPTY_CANVAS, LOADED_CANVAS
 
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop is optional
+    uvloop = None
 
-@pytest.fixture
-def event_loop():
-    """Create an asyncio event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests and fixtures on uvloop when it is installed."""
+        return {"uvloop": uvloop.new_event_loop}
 
 
 @pytest.fixture
 def mock_n8n_api():
     """Mock n8n API client."""
+    from tests.mocks.n8n_api_mock import N8nApiMock
     return N8nApiMock()
 
 
 @pytest.fixture
 def mock_redis_client():
     """Mock Redis client."""
+    from tests.mocks.redis_mock import RedisMock
     return RedisMock()
 
 
 @pytest.fixture
 def mock_websocket():
     """Mock WebSocket connection."""
+    from tests.mocks.websocket_mock import WebSocketMock
     return WebSocketMock()
 
 
 @pytest.fixture
 def mock_external_service():
     """Mock external service client."""
+    from tests.mocks.external_services_mock import ExternalServiceMock
     return ExternalServiceMock("test-service")
 
 
-@pytest.fixture
-def mock_state_manager():
-    """Mock state manager."""
-    state_manager = Mock()
-    state_manager.get_state = AsyncMock(return_value={})
-    state_manager.set_state = AsyncMock(return_value=True)
-    state_manager.update_state = AsyncMock(return_value=True)
-    return state_manager
+def _pooled_mock(spec: type, defaults: Dict[str, Any]):
+    """Build a mock of spec whose async methods return the given defaults."""
+    children = {
+        name: AsyncMock(return_value=copy.deepcopy(value))
+        for name, value in defaults.items()
+    }
+    return Mock(spec=spec, **children), children, defaults
+
+
+def _reset_pooled_mock(mock: Mock, children: Dict[str, AsyncMock],
+                       defaults: Dict[str, Any]) -> None:
+    """Return a pooled mock to the state _pooled_mock built it in.
+
+    Return values and side effects a test set are cleared, each child gets a
+    fresh copy of its default return value, and any child a test replaced
+    is reattached.
+    """
+    mock.reset_mock(return_value=True, side_effect=True)
+    for name, child in children.items():
+        child.reset_mock(return_value=True, side_effect=True)
+        child.return_value = copy.deepcopy(defaults[name])
+    mock.configure_mock(**children)
+
+
+@pytest.fixture(scope="session")
+def _pooled_state_manager():
+    """Single state manager mock shared by every test in the session."""
+    return _pooled_mock(StateManagerProtocol, {
+        "get_state": {},
+        "set_state": True,
+        "update_state": True
+    })
+
+
+@pytest.fixture(scope="session")
+def _pooled_event_bus():
+    """Single event bus mock shared by every test in the session."""
+    return _pooled_mock(EventBusProtocol, {
+        "publish": True,
+        "request": {"success": True},
+        "subscribe": True
+    })
 
 
 @pytest.fixture
-def mock_event_bus():
-    """Mock event bus."""
-    event_bus = Mock()
-    event_bus.publish = AsyncMock(return_value=True)
-    event_bus.request = AsyncMock(return_value={"success": True})
-    event_bus.subscribe = AsyncMock(return_value=True)
-    return event_bus
+def mock_state_manager(_pooled_state_manager):
+    """Mock state manager, reset after each test."""
+    state_manager, children, defaults = _pooled_state_manager
+    yield state_manager
+    _reset_pooled_mock(state_manager, children, defaults)
 
 
 @pytest.fixture
+def mock_event_bus(_pooled_event_bus):
+    """Mock event bus, reset after each test."""
+    event_bus, children, defaults = _pooled_event_bus
+    yield event_bus
+    _reset_pooled_mock(event_bus, children, defaults)
+
+
+@pytest.fixture(scope="session")
 def simple_workflow():
-    """Sample simple workflow for testing."""
-    return SIMPLE_WORKFLOW.copy()
+    """Sample simple workflow for testing (read-only)."""
+    return SIMPLE_WORKFLOW
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def complex_workflow():
-    """Sample complex workflow for testing."""
-    return COMPLEX_WORKFLOW.copy()
+    """Sample complex workflow for testing (read-only)."""
+    return COMPLEX_WORKFLOW
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_credentials():
-    """Valid test credentials."""
-    return TEST_CREDENTIALS.copy()
+    """Valid test credentials (read-only)."""
+    return VALID_CREDENTIALS
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def empty_canvas():
-    """Empty canvas state."""
-    return EMPTY_CANVAS.copy()
+    """Empty canvas state (read-only)."""
+    return EMPTY_CANVAS
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def loaded_canvas():
-    """Loaded canvas with nodes."""
-    return LOADED_CANVAS.copy()
+    """Loaded canvas with nodes (read-only)."""
+    return LOADED_CANVAS
+
+
+@pytest.fixture
+def mutable_simple_workflow(simple_workflow):
+    """Private, mutable deep copy of the simple workflow."""
+    return thaw(simple_workflow)
+
+
+@pytest.fixture
+def mutable_complex_workflow(complex_workflow):
+    """Private, mutable deep copy of the complex workflow."""
+    return thaw(complex_workflow)
+
+
+@pytest.fixture
+def mutable_valid_credentials(valid_credentials):
+    """Private, mutable deep copy of the valid test credentials."""
+    return thaw(valid_credentials)
+
+
+@pytest.fixture
+def mutable_empty_canvas(empty_canvas):
+    """Private, mutable deep copy of the empty canvas state."""
+    return thaw(empty_canvas)
 
 
 @pytest.fixture
+def mutable_loaded_canvas(loaded_canvas):
+    """Private, mutable deep copy of the loaded canvas."""
+    return thaw(loaded_canvas)
+
+
+@pytest.fixture(scope="session")
 def mock_workflow_execution_input():
     """Mock workflow execution input."""
-    return {
+    return freeze({
         "workflowId": "test-workflow-123",
         "executionId": "exec-456",
         "inputData": {"test": "data"},
@@ -114,13 +194,13 @@ def mock_workflow_execution_input():
             "maxRetries": 3,
             "parallelExecution": False
         }
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_node_validation_input():
     """Mock node validation input."""
-    return {
+    return freeze({
         "nodeType": "n8n-nodes-base.httpRequest",
         "parameters": {
             "method": "GET",
@@ -134,25 +214,25 @@ def mock_node_validation_input():
             "workflowId": "test-workflow-123",
             "availableNodes": ["httpRequest", "set", "if"]
         }
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_canvas_management_input():
     """Mock canvas management input."""
-    return {
+    return freeze({
         "action": "move",
         "targetNodes": ["node-1", "node-2"],
         "position": {"x": 100, "y": 200},
         "zoomLevel": 1.0,
         "panOffset": {"x": 0, "y": 0}
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_integration_input():
     """Mock integration input."""
-    return {
+    return freeze({
         "serviceName": "github",
         "operation": "authenticate",
         "credentials": {
@@ -160,13 +240,17 @@ def mock_integration_input():
         },
         "parameters": {},
         "data": None
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_export_import_input():
-    """Mock export/import input."""
-    return {
+    """Mock export/import input.
+
+    workflowData is the shared, frozen SIMPLE_WORKFLOW itself; use
+    mutable_input("mock_export_import_input") to get an editable copy.
+    """
+    return freeze({
         "action": "export",
         "workflowId": "test-workflow-123",
         "workflowData": SIMPLE_WORKFLOW,
@@ -176,51 +260,92 @@ def mock_export_import_input():
             "includeExecutionHistory": False,
             "version": "1.0.0"
         }
-    }
+    })
+
+
+@pytest.fixture
+def mutable_input(request):
+    """Return a mutable deep copy of one of the session-scoped input fixtures."""
+    def _mutable_input(fixture_name: str) -> Dict[str, Any]:
+        return thaw(request.getfixturevalue(fixture_name))
+    return _mutable_input
 
 
 # Test utilities
 @pytest.fixture
 def generate_id():
     """Generate unique IDs for tests."""
-    import uuid
     return str(uuid.uuid4())
 
 
 @pytest.fixture
+def id_factory():
+    """Generate unique UUID4-formatted IDs for tests; call it once per ID."""
+    batch_size = 64
+    buffer = os.urandom(16 * batch_size)
+    offset = 0
+
+    def _generate_id() -> str:
+        nonlocal buffer, offset
+        if offset == len(buffer):
+            buffer = os.urandom(16 * batch_size)
+            offset = 0
+
+        raw = bytearray(buffer[offset:offset + 16])
+        offset += 16
+        raw[6] = (raw[6] & 0x0F) | 0x40  # Version 4
+        raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+
+        hex_id = raw.hex()
+        return f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+
+    return _generate_id
+
+
+@pytest.fixture(scope="session")
 def wait_for_async():
-    """Wait for async operations in tests."""
+    """Wait for async operations in (synchronous) tests on one shared loop."""
+    loop = asyncio.new_event_loop()
+
     def _wait_for_async(coro):
-        return asyncio.run(coro)
-    return _wait_for_async
+        return loop.run_until_complete(coro)
+
+    yield _wait_for_async
+    loop.close()
 
 
 # Performance testing utilities
-@pytest.fixture
-def performance_monitor():
-    """Monitor performance during tests."""
-    import time
+_perf_counter_ns = time.perf_counter_ns
 
-    class PerformanceMonitor:
-        def __init__(self):
-            self.start_times = {}
-            self.end_times = {}
 
-        def start_timer(self, name: str):
-            self.start_times[name] = time.time()
+class PerformanceMonitor:
+    """Named timers backed by the monotonic performance counter."""
 
-        def end_timer(self, name: str):
-            self.end_times[name] = time.time()
+    def __init__(self):
+        # Monotonic timestamps in nanoseconds
+        self.start_times: Dict[str, int] = {}
+        self.end_times: Dict[str, int] = {}
 
-        def get_duration(self, name: str) -> float:
-            if name in self.start_times and name in self.end_times:
-                return self.end_times[name] - self.start_times[name]
-            return 0.0
+    def start_timer(self, name: str):
+        self.start_times[name] = _perf_counter_ns()
 
-        def reset(self):
-            self.start_times.clear()
-            self.end_times.clear()
+    def end_timer(self, name: str):
+        self.end_times[name] = _perf_counter_ns()
 
+    def get_duration(self, name: str) -> float:
+        """Elapsed time in seconds."""
+        if name in self.start_times and name in self.end_times:
+            return (self.end_times[name] - self.start_times[name]) * 1e-9
+        return 0.0
+
+    def reset(self):
+        self.start_times.clear()
+        self.end_times.clear()
+
+
+@pytest.fixture
+def performance_monitor():
+    """Monitor performance during tests."""
     return PerformanceMonitor()
 
 
@@ -229,57 +354,41 @@ def performance_monitor():
 async def async_cleanup():
     """Cleanup after async tests."""
     yield
-    # Cleanup code here
-    await asyncio.sleep(0.1)  # Allow pending tasks to complete
-
-
-# Custom pytest markers
-def pytest_configure(config):
-    """Configure custom pytest markers."""
-    config.addinivalue_line(
-        "markers", "unit: mark test as a unit test"
-    )
-    config.addinivalue_line(
-        "markers", "integration: mark test as an integration test"
-    )
-    config.addinivalue_line(
-        "markers", "e2e: mark test as an end-to-end test"
-    )
-    config.addinivalue_line(
-        "markers", "performance: mark test as a performance test"
-    )
-    config.addinivalue_line(
-        "markers", "security: mark test as a security test"
-    )
-    config.addinivalue_line(
-        "markers", "slow: mark test as slow running"
-    )
+    # Wait for pending tasks to complete, returning immediately if there are none
+    pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    if pending:
+        await asyncio.wait(pending, timeout=0.5)
 
 
 # Test data factories
 @pytest.fixture
 def workflow_factory():
-    """Factory for creating test workflows."""
-    def create_workflow(node_count: int = 3, connections: bool = True):
-        nodes = []
-        edges = []
-
-        for i in range(node_count):
-            nodes.append({
-                "id": f"node-{i}",
-                "type": "n8n-nodes-base.set",
+    """Factory for creating test workflows.
+
+    Extra keyword arguments are added as top-level workflow fields, e.g.
+    workflow_factory(5, node_type="n8n-nodes-base.if", version="1.0.0").
+    """
+    def create_workflow(node_count: int = 3, connections: bool = True,
+                        node_type: str = "n8n-nodes-base.set", **workflow_fields):
+        nodes = [
+            {
+                "id": node_id(i),
+                "type": node_type,
                 "position": {"x": 100 + i * 200, "y": 100},
                 "parameters": {"values": {"string": [{"name": "test", "value": f"value-{i}"}]}}
-            })
-
-        if connections and node_count > 1:
-            for i in range(node_count - 1):
-                edges.append({
-                    "id": f"edge-{i}-{i+1}",
-                    "source": f"node-{i}",
-                    "target": f"node-{i+1}"
-                })
-
-        return {"nodes": nodes, "connections": edges}
+            }
+            for i in range(node_count)
+        ]
+
+        edges = [
+            {
+                "id": edge_id(i),
+                "source": node_id(i),
+                "target": node_id(i + 1)
+            }
+            for i in range(node_count - 1)
+        ] if connections else []
+
+        return {"nodes": nodes, "connections": edges, **workflow_fields}
 
     return create_workflow
@@ -0,0 +1,81 @@
+"""
+Helpers for building shared fixture data and exposing it as read-only
+structures.
+"""
+
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+# id -> (frozen value, serialized JSON or None) for every module-level constant
+# returned by freeze()
+_FROZEN: Dict[int, Tuple[Any, Optional[bytes]]] = {}
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def freeze(value: Any, constant: Optional[bool] = None) -> Any:
+    """Recursively convert dicts to mapping proxies and lists to tuples.
+
+    Only constants are registered for thaw()'s cached copy: they live for the
+    whole run anyway, while registering values frozen inside functions (e.g.
+    per-test) would keep them alive for good. By default a value counts as a
+    constant when it is frozen at module scope; pass constant=True for one
+    built lazily but kept for the run.
+    """
+    frozen = _freeze(value)
+    if constant is None:
+        caller = sys._getframe(1)
+        constant = caller.f_locals is caller.f_globals
+    if constant and isinstance(frozen, MappingProxyType) and id(frozen) not in _FROZEN:
+        _FROZEN[id(frozen)] = (frozen, None)
+    return frozen
+
+
+def thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a (possibly frozen) fixture structure.
+
+    Module-level constants produced by freeze() can never change, so when
+    orjson is available they are serialized once and every later copy is a
+    single orjson.loads.
+    """
+    entry = _FROZEN.get(id(value))
+    if orjson is None or entry is None or entry[0] is not value:
+        return _thaw(value)
+
+    blob = entry[1]
+    if blob is None:
+        try:
+            blob = orjson.dumps(value, default=dict)
+        except TypeError:
+            # Not plain JSON data (e.g. non-string keys); always copy it the slow way
+            del _FROZEN[id(value)]
+            return _thaw(value)
+        _FROZEN[id(value)] = (value, blob)
+
+    return orjson.loads(blob)
+
+
+def build_node(node_id: str, node_type: str, position: Any, **rest: Any) -> Dict[str, Any]:
+    """Build a node dict with the standard id/type/position keys first."""
+    return {"id": node_id, "type": node_type, "position": position, **rest}
@@ -0,0 +1,27 @@
+"""
+Cached node/edge ID strings for generated test workflows.
+"""
+
+from typing import Callable, List
+
+
+def _cached_ids(format_id: Callable[[int], str]) -> Callable[[int], str]:
+    """Return a lookup that formats each index once and reuses the string."""
+    ids: List[str] = []
+
+    def lookup(index: int) -> str:
+        while len(ids) <= index:
+            ids.append(format_id(len(ids)))
+        return ids[index]
+
+    return lookup
+
+
+# "node-{i}"
+node_id = _cached_ids(lambda i: f"node-{i}")
+
+# "edge-{i}-{i+1}", linking node i to node i + 1
+edge_id = _cached_ids(lambda i: f"edge-{i}-{i + 1}")
+
+# "connection-{i}", linking node i to node i + 1
+connection_id = _cached_ids(lambda i: f"connection-{i}")
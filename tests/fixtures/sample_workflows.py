@@ -2,30 +2,32 @@
 Sample workflows and test data for testing purposes.
 """
 
-from typing import Dict, Any, List
+import functools
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+from tests.fixtures.frozen import build_node, freeze
+from tests.fixtures.ids import connection_id, node_id
 
 
 # Simple workflow with basic trigger and action
-SIMPLE_WORKFLOW = {
+SIMPLE_WORKFLOW = freeze({
     "nodes": [
-        {
-            "id": "manual-trigger",
-            "type": "n8n-nodes-base.manualTrigger",
-            "position": [100, 100],
-            "parameters": {
+        build_node(
+            "manual-trigger", "n8n-nodes-base.manualTrigger", [100, 100],
+            parameters={
                 "description": "Manual trigger for testing"
             }
-        },
-        {
-            "id": "http-request",
-            "type": "n8n-nodes-base.httpRequest",
-            "position": [300, 100],
-            "parameters": {
+        ),
+        build_node(
+            "http-request", "n8n-nodes-base.httpRequest", [300, 100],
+            parameters={
                 "method": "GET",
                 "url": "https://jsonplaceholder.typicode.com/posts/1",
                 "options": {}
             }
-        }
+        )
     ],
     "connections": [
         {
@@ -36,25 +38,21 @@ SIMPLE_WORKFLOW = {
             "targetInput": 0
         }
     ]
-}
+})
 
 # Complex workflow with branching logic
-COMPLEX_WORKFLOW = {
+COMPLEX_WORKFLOW = freeze({
     "nodes": [
-        {
-            "id": "webhook-trigger",
-            "type": "n8n-nodes-base.webhook",
-            "position": [50, 50],
-            "parameters": {
+        build_node(
+            "webhook-trigger", "n8n-nodes-base.webhook", [50, 50],
+            parameters={
                 "httpMethod": "POST",
                 "path": "test-webhook"
             }
-        },
-        {
-            "id": "if-condition",
-            "type": "n8n-nodes-base.if",
-            "position": [200, 50],
-            "parameters": {
+        ),
+        build_node(
+            "if-condition", "n8n-nodes-base.if", [200, 50],
+            parameters={
                 "conditions": {
                     "boolean": [
                         {
@@ -64,35 +62,29 @@ COMPLEX_WORKFLOW = {
                     ]
                 }
             }
-        },
-        {
-            "id": "email-success",
-            "type": "n8n-nodes-base.gmail",
-            "position": [350, 20],
-            "parameters": {
+        ),
+        build_node(
+            "email-success", "n8n-nodes-base.gmail", [350, 20],
+            parameters={
                 "to": "success@example.com",
                 "subject": "Success notification",
                 "text": "={{ $json.message }}"
             }
-        },
-        {
-            "id": "email-failure",
-            "type": "n8n-nodes-base.gmail",
-            "position": [350, 80],
-            "parameters": {
+        ),
+        build_node(
+            "email-failure", "n8n-nodes-base.gmail", [350, 80],
+            parameters={
                 "to": "admin@example.com",
                 "subject": "Failure alert",
                 "text": "={{ $json.error }}"
             }
-        },
-        {
-            "id": "database-save",
-            "type": "n8n-nodes-base.postgres",
-            "position": [500, 50],
-            "parameters": {
+        ),
+        build_node(
+            "database-save", "n8n-nodes-base.postgres", [500, 50],
+            parameters={
                 "query": "INSERT INTO logs (status, message) VALUES ({{ $json.status }}, {{ $json.message }})"
             }
-        }
+        )
     ],
     "connections": [
         {
@@ -131,32 +123,24 @@ COMPLEX_WORKFLOW = {
             "targetInput": 0
         }
     ]
-}
+})
 
 # Workflow with loops and iterations
-LOOP_WORKFLOW = {
+LOOP_WORKFLOW = freeze({
     "nodes": [
-        {
-            "id": "manual-trigger",
-            "type": "n8n-nodes-base.manualTrigger",
-            "position": [100, 100]
-        },
-        {
-            "id": "split-in-batches",
-            "type": "n8n-nodes-base.splitInBatches",
-            "position": [300, 100],
-            "parameters": {
+        build_node("manual-trigger", "n8n-nodes-base.manualTrigger", [100, 100]),
+        build_node(
+            "split-in-batches", "n8n-nodes-base.splitInBatches", [300, 100],
+            parameters={
                 "batchSize": 2,
                 "options": {
                     "reset": True
                 }
             }
-        },
-        {
-            "id": "process-batch",
-            "type": "n8n-nodes-base.set",
-            "position": [500, 100],
-            "parameters": {
+        ),
+        build_node(
+            "process-batch", "n8n-nodes-base.set", [500, 100],
+            parameters={
                 "values": {
                     "string": [
                         {
@@ -166,7 +150,7 @@ LOOP_WORKFLOW = {
                     ]
                 }
             }
-        }
+        )
     ],
     "connections": [
         {
@@ -184,39 +168,29 @@ LOOP_WORKFLOW = {
             "targetInput": 0
         }
     ]
-}
+})
 
 # Error handling workflow
-ERROR_HANDLING_WORKFLOW = {
+ERROR_HANDLING_WORKFLOW = freeze({
     "nodes": [
-        {
-            "id": "trigger",
-            "type": "n8n-nodes-base.manualTrigger",
-            "position": [100, 100]
-        },
-        {
-            "id": "error-prone-action",
-            "type": "n8n-nodes-base.httpRequest",
-            "position": [300, 100],
-            "parameters": {
+        build_node("trigger", "n8n-nodes-base.manualTrigger", [100, 100]),
+        build_node(
+            "error-prone-action", "n8n-nodes-base.httpRequest", [300, 100],
+            parameters={
                 "method": "GET",
                 "url": "https://httpstat.us/500",  # Always returns 500 error
                 "options": {
                     "timeout": 1
                 }
             }
-        },
-        {
-            "id": "error-handler",
-            "type": "n8n-nodes-base.errorTrigger",
-            "position": [300, 200],
-            "parameters": {}
-        },
-        {
-            "id": "fallback-action",
-            "type": "n8n-nodes-base.set",
-            "position": [500, 200],
-            "parameters": {
+        ),
+        build_node(
+            "error-handler", "n8n-nodes-base.errorTrigger", [300, 200],
+            parameters={}
+        ),
+        build_node(
+            "fallback-action", "n8n-nodes-base.set", [500, 200],
+            parameters={
                 "values": {
                     "string": [
                         {
@@ -226,7 +200,7 @@ ERROR_HANDLING_WORKFLOW = {
                     ]
                 }
             }
-        }
+        )
     ],
     "connections": [
         {
@@ -251,24 +225,20 @@ ERROR_HANDLING_WORKFLOW = {
             "targetInput": 0
         }
     ]
-}
+})
 
 # AI workflow with multiple AI nodes
-AI_WORKFLOW = {
+AI_WORKFLOW = freeze({
     "nodes": [
-        {
-            "id": "input-trigger",
-            "type": "n8n-nodes-base.manualTrigger",
-            "position": [100, 100],
-            "parameters": {
+        build_node(
+            "input-trigger", "n8n-nodes-base.manualTrigger", [100, 100],
+            parameters={
                 "description": "Input text for AI processing"
             }
-        },
-        {
-            "id": "text-analysis",
-            "type": "n8n-nodes-base.openAI",
-            "position": [300, 100],
-            "parameters": {
+        ),
+        build_node(
+            "text-analysis", "n8n-nodes-base.openAI", [300, 100],
+            parameters={
                 "model": "gpt-3.5-turbo",
                 "messages": [
                     {
@@ -281,16 +251,14 @@ AI_WORKFLOW = {
                     }
                 ]
             }
-        },
-        {
-            "id": "text-summarization",
-            "type": "n8n-nodes-base.anthropic",
-            "position": [500, 100],
-            "parameters": {
+        ),
+        build_node(
+            "text-summarization", "n8n-nodes-base.anthropic", [500, 100],
+            parameters={
                 "model": "claude-2",
                 "prompt": "Summarize the following text: {{ $json.analysis }}"
             }
-        }
+        )
     ],
     "connections": [
         {
@@ -308,48 +276,85 @@ AI_WORKFLOW = {
             "targetInput": 0
         }
     ]
-}
+})
 
-# Large workflow for performance testing
-LARGE_WORKFLOW = {
-    "nodes": [],
-    "connections": []
-}
-
-# Generate 50 nodes for performance testing
-for i in range(50):
-    node_id = f"node-{i}"
-    node_type = "n8n-nodes-base.set" if i % 5 != 0 else "n8n-nodes-base.if"
-
-    LARGE_WORKFLOW["nodes"].append({
-        "id": node_id,
-        "type": node_type,
-        "position": [100 + (i % 10) * 150, 100 + (i // 10) * 100],
-        "parameters": {
-            "values": {
-                "string": [
-                    {
-                        "name": f"field-{i}",
-                        "value": f"value-{i}"
+
+@dataclass(frozen=True)
+class LargeWorkflowColumns:
+    """Column-oriented view of LARGE_WORKFLOW: one tuple per node attribute.
+
+    Tests that only look at node ids, types or positions can read these
+    directly; as_dict() materializes the regular nodes/connections form.
+    """
+
+    ids: Tuple[str, ...]
+    types: Tuple[str, ...]
+    positions: Tuple[Tuple[int, int], ...]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Build the workflow as a list of node dicts chained by connections."""
+        nodes = [
+            build_node(
+                self.ids[i], self.types[i], list(self.positions[i]),
+                parameters={
+                    "values": {
+                        "string": [
+                            {
+                                "name": f"field-{i}",
+                                "value": f"value-{i}"
+                            }
+                        ]
                     }
-                ]
+                }
+            )
+            for i in range(len(self))
+        ]
+
+        # Create connections in a chain pattern
+        connections = [
+            {
+                "id": connection_id(i),
+                "source": self.ids[i],
+                "target": self.ids[i + 1],
+                "sourceOutput": 0,
+                "targetInput": 0
             }
-        }
-    })
+            for i in range(len(self) - 1)
+        ]
+
+        return {"nodes": nodes, "connections": connections}
+
+
+@functools.cache
+def get_large_workflow_columns() -> LargeWorkflowColumns:
+    """Get the column-oriented view of the 50-node performance workflow."""
+    indices = range(50)
+    return LargeWorkflowColumns(
+        ids=tuple(node_id(i) for i in indices),
+        types=tuple("n8n-nodes-base.set" if i % 5 != 0 else "n8n-nodes-base.if" for i in indices),
+        positions=tuple((100 + (i % 10) * 150, 100 + (i // 10) * 100) for i in indices)
+    )
+
 
-# Create connections in a chain pattern
-for i in range(49):
-    LARGE_WORKFLOW["connections"].append({
-        "id": f"connection-{i}",
-        "source": f"node-{i}",
-        "target": f"node-{i+1}",
-        "sourceOutput": 0,
-        "targetInput": 0
-    })
+# Large workflow for performance testing, built on first use (see __getattr__)
+@functools.cache
+def _build_large_workflow() -> Mapping[str, Any]:
+    """Build the 50-node chained workflow used for performance testing."""
+    return freeze(get_large_workflow_columns().as_dict(), constant=True)
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve LARGE_WORKFLOW lazily so importing this module stays cheap."""
+    if name == "LARGE_WORKFLOW":
+        return _build_large_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Invalid workflows for testing error handling
-INVALID_WORKFLOW_MISSING_NODES = {
+INVALID_WORKFLOW_MISSING_NODES = freeze({
     "nodes": [],
     "connections": [
         {
@@ -357,35 +362,31 @@ INVALID_WORKFLOW_MISSING_NODES = {
             "target": "another-non-existent-node"
         }
     ]
-}
+})
 
-INVALID_WORKFLOW_CIRCULAR_DEPENDENCY = {
+INVALID_WORKFLOW_CIRCULAR_DEPENDENCY = freeze({
     "nodes": [
-        {"id": "node-1", "type": "n8n-nodes-base.set", "position": [100, 100]},
-        {"id": "node-2", "type": "n8n-nodes-base.set", "position": [300, 100]},
-        {"id": "node-3", "type": "n8n-nodes-base.set", "position": [500, 100]}
+        build_node("node-1", "n8n-nodes-base.set", [100, 100]),
+        build_node("node-2", "n8n-nodes-base.set", [300, 100]),
+        build_node("node-3", "n8n-nodes-base.set", [500, 100])
     ],
     "connections": [
         {"source": "node-1", "target": "node-2"},
         {"source": "node-2", "target": "node-3"},
         {"source": "node-3", "target": "node-1"}  # Creates circular dependency
     ]
-}
+})
 
-INVALID_WORKFLOW_INVALID_NODE_TYPE = {
+INVALID_WORKFLOW_INVALID_NODE_TYPE = freeze({
     "nodes": [
-        {
-            "id": "invalid-node",
-            "type": "non-existent-node-type",
-            "position": [100, 100]
-        }
+        build_node("invalid-node", "non-existent-node-type", [100, 100])
     ],
     "connections": []
-}
+})
 
 
 # Workflow templates for testing import/export
-WORKFLOW_TEMPLATES = {
+WORKFLOW_TEMPLATES = freeze({
     "email-automation": {
         "name": "Email Automation Template",
         "description": "Automated email processing workflow",
@@ -404,25 +405,29 @@ WORKFLOW_TEMPLATES = {
         "category": "Logic",
         "workflow": ERROR_HANDLING_WORKFLOW
     }
-}
+})
 
 
-def get_workflow_by_name(name: str) -> Dict[str, Any]:
+# Name -> workflow lookup; "large" is resolved lazily in get_workflow_by_name
+_WORKFLOWS_BY_NAME = MappingProxyType({
+    "simple": SIMPLE_WORKFLOW,
+    "complex": COMPLEX_WORKFLOW,
+    "loop": LOOP_WORKFLOW,
+    "error-handling": ERROR_HANDLING_WORKFLOW,
+    "ai": AI_WORKFLOW,
+    "invalid-missing": INVALID_WORKFLOW_MISSING_NODES,
+    "invalid-circular": INVALID_WORKFLOW_CIRCULAR_DEPENDENCY,
+    "invalid-type": INVALID_WORKFLOW_INVALID_NODE_TYPE
+})
+
+
+def get_workflow_by_name(name: str) -> Mapping[str, Any]:
     """Get workflow by name."""
-    workflows = {
-        "simple": SIMPLE_WORKFLOW,
-        "complex": COMPLEX_WORKFLOW,
-        "loop": LOOP_WORKFLOW,
-        "error-handling": ERROR_HANDLING_WORKFLOW,
-        "ai": AI_WORKFLOW,
-        "large": LARGE_WORKFLOW,
-        "invalid-missing": INVALID_WORKFLOW_MISSING_NODES,
-        "invalid-circular": INVALID_WORKFLOW_CIRCULAR_DEPENDENCY,
-        "invalid-type": INVALID_WORKFLOW_INVALID_NODE_TYPE
-    }
-    return workflows.get(name, SIMPLE_WORKFLOW)
+    if name == "large":
+        return _build_large_workflow()
+    return _WORKFLOWS_BY_NAME.get(name, SIMPLE_WORKFLOW)
 
 
-def get_template_by_name(name: str) -> Dict[str, Any]:
+def get_template_by_name(name: str) -> Mapping[str, Any]:
     """Get workflow template by name."""
     return WORKFLOW_TEMPLATES.get(name, WORKFLOW_TEMPLATES["email-automation"])
@@ -4,41 +4,106 @@ Integration tests for canvas collaboration features.
 
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock
 
-from tests.mocks.websocket_mock import WebSocketMock, WebSocketServerMock
+from tests.fixtures.frozen import freeze
+from tests.mocks.websocket_mock import WebSocketServerMock
+
+
+# Canvas states shared (read-only) by the collaboration tests
+TWO_NODE_CANVAS = freeze({
+    "nodes": [
+        {"id": "node-1", "type": "trigger", "position": {"x": 100, "y": 100}},
+        {"id": "node-2", "type": "action", "position": {"x": 300, "y": 100}}
+    ],
+    "edges": [{"id": "edge-1-2", "source": "node-1", "target": "node-2"}],
+    "viewport": {"x": 0, "y": 0, "zoom": 1.0}
+})
+
+RECONNECTED_CANVAS = freeze({
+    "nodes": [
+        {"id": "existing-node", "type": "set", "position": {"x": 100, "y": 100}},
+        {"id": "new-node", "type": "set", "position": {"x": 200, "y": 200}}
+    ],
+    "edges": [],
+    "viewport": {"x": 0, "y": 0, "zoom": 1.0}
+})
+
+# Workflow execution monitoring events, broadcast as "execution_event" envelopes
+EXECUTION_EVENTS = freeze([
+    {"type": "execution_start", "executionId": "exec-1", "workflowId": "workflow-1"},
+    {"type": "node_start", "executionId": "exec-1", "nodeId": "node-1"},
+    {"type": "node_complete", "executionId": "exec-1", "nodeId": "node-1", "output": {"result": "success"}},
+    {"type": "node_start", "executionId": "exec-1", "nodeId": "node-2"},
+    {"type": "execution_complete", "executionId": "exec-1", "status": "success", "results": {"final": "output"}}
+])
+
+# Performance monitoring events, broadcast as "performance" envelopes
+PERFORMANCE_EVENTS = freeze([
+    {"type": "performance_metric", "metric": "execution_time", "value": 2.5, "unit": "seconds"},
+    {"type": "performance_metric", "metric": "memory_usage", "value": 85, "unit": "MB"},
+    {"type": "performance_metric", "metric": "network_latency", "value": 150, "unit": "ms"},
+    {"type": "performance_alert", "level": "warning", "message": "High memory usage detected"}
+])
+
+# Session management events, broadcast as "session" envelopes
+SESSION_EVENTS = freeze([
+    {"type": "session_start", "sessionId": "session-1", "participants": ["user-1", "user-2"]},
+    {"type": "user_join", "userId": "user-3", "sessionId": "session-1"},
+    {"type": "user_leave", "userId": "user-2", "sessionId": "session-1"},
+    {"type": "session_end", "sessionId": "session-1"}
+])
+
+# Data validation events, broadcast as "validation" envelopes
+VALIDATION_EVENTS = freeze([
+    {"type": "validation_error", "nodeId": "node-1", "error": "Missing required parameter"},
+    {"type": "validation_warning", "nodeId": "node-2", "warning": "Deprecated parameter used"},
+    {"type": "validation_success", "nodeId": "node-3", "message": "Node configuration valid"}
+])
+
+# Workflow testing and debugging events, broadcast as "testing" envelopes
+TESTING_EVENTS = freeze([
+    {"type": "test_start", "testId": "test-1", "workflowId": "workflow-1"},
+    {"type": "test_node", "testId": "test-1", "nodeId": "node-1", "status": "running"},
+    {"type": "test_result", "testId": "test-1", "nodeId": "node-1", "output": {"result": "success"}},
+    {"type": "test_complete", "testId": "test-1", "status": "passed", "duration": 2.5}
+])
+
+
+def _envelopes(envelope_type, events):
+    """Wrap each event in a {"type": envelope_type, "data": event} message."""
+    return [{"type": envelope_type, "data": event} for event in events]
+
+
+def _assert_all_received(connections, envelope_type, events):
+    """Assert every connection has exactly one envelope_type message per event."""
+    for connection in connections:
+        assert len(connection.drain(envelope_type)) == len(events)
 
 
 class TestCanvasCollaboration:
     """Integration tests for canvas collaboration."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def websocket_server(self):
-        """Mock WebSocket server for collaboration testing."""
+        """Mock WebSocket server for collaboration testing, shared by the module."""
         return WebSocketServerMock()
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def client_connections(self, websocket_server):
         """Create multiple client connections for testing."""
-        connections = []
-        for i in range(3):
-            connection = websocket_server.create_connection()
-            connections.append(connection)
+        return websocket_server.create_connections(3)
 
-        return connections
+    @pytest.fixture(autouse=True)
+    def _reset_ws(self, websocket_server, client_connections):
+        """Clear broadcasts and client state left over from the previous test."""
+        websocket_server.broadcast_messages.clear()
+        for connection in client_connections:
+            connection.reset()
+        yield
 
     @pytest.mark.asyncio
     async def test_multi_user_collaboration(self, websocket_server, client_connections):
         """Test multiple users collaborating on the same canvas."""
-        # Setup initial canvas state
-        initial_canvas = {
-            "nodes": [
-                {"id": "shared-node", "type": "n8n-nodes-base.set", "position": {"x": 100, "y": 100}}
-            ],
-            "edges": [],
-            "viewport": {"x": 0, "y": 0, "zoom": 1.0}
-        }
-
         # Simulate collaborative editing
         user_actions = [
             {"user": "user-1", "action": "move", "nodeId": "shared-node", "position": {"x": 200, "y": 150}},
@@ -46,21 +111,20 @@ class TestCanvasCollaboration:
             {"user": "user-3", "action": "add", "nodeType": "n8n-nodes-base.httpRequest", "position": {"x": 300, "y": 100}}
         ]
 
-        # Execute collaborative actions
-        for action in user_actions:
-            # Broadcast action to all other users
-            message = {
+        # Execute collaborative actions, broadcasting each to all other users
+        await websocket_server.broadcast_many([
+            {
                 "type": "canvas_update",
                 "userId": action["user"],
                 "action": action["action"],
                 "data": action
             }
-
-            await websocket_server.broadcast(message)
+            for action in user_actions
+        ])
 
         # Verify all clients received updates
         for connection in client_connections:
-            assert connection.get_message_count("received") > 0
+            assert connection.received_count > 0
 
         # Verify server tracked all broadcasts
         assert len(websocket_server.broadcast_messages) == len(user_actions)
@@ -92,8 +156,7 @@ class TestCanvasCollaboration:
         }
 
         # Broadcast conflicting messages
-        await websocket_server.broadcast(user1_message)
-        await websocket_server.broadcast(user2_message)
+        await websocket_server.broadcast_many([user1_message, user2_message])
 
         # Verify conflict detection and resolution
         # In real implementation, would verify conflict resolution strategy
@@ -102,20 +165,7 @@ class TestCanvasCollaboration:
     async def test_real_time_synchronization(self, websocket_server, client_connections):
         """Test real-time synchronization of canvas state."""
         # Setup initial state
-        initial_state = {
-            "nodes": [
-                {"id": "node-1", "type": "trigger", "position": {"x": 100, "y": 100}},
-                {"id": "node-2", "type": "action", "position": {"x": 300, "y": 100}}
-            ],
-            "edges": [{"id": "edge-1-2", "source": "node-1", "target": "node-2"}],
-            "viewport": {"x": 0, "y": 0, "zoom": 1.0}
-        }
-
-        # Broadcast initial state to all clients
-        await websocket_server.broadcast({
-            "type": "initial_state",
-            "data": initial_state
-        })
+        initial_state = TWO_NODE_CANVAS
 
         # Simulate state changes
         state_changes = [
@@ -124,15 +174,18 @@ class TestCanvasCollaboration:
             {"type": "connection_add", "edge": {"id": "edge-2-3", "source": "node-2", "target": "node-3"}}
         ]
 
-        for change in state_changes:
-            await websocket_server.broadcast({
-                "type": "state_change",
-                "data": change
-            })
+        # Broadcast initial state to all clients, followed by the changes
+        envelopes = [{"type": "initial_state", "data": initial_state}]
+        envelopes += _envelopes("state_change", state_changes)
+        await websocket_server.broadcast_many(envelopes)
 
-            # Verify all clients received the change
-            for connection in client_connections:
-                assert connection.get_message_count("received") > 0
+        # Verify all clients received the initial state and every change, in order
+        for connection in client_connections:
+            messages = connection.drain()
+            assert [message["type"] for message in messages] == [
+                envelope["type"] for envelope in envelopes
+            ]
+            assert [message["data"] for message in messages[1:]] == state_changes
 
     @pytest.mark.asyncio
     async def test_offline_reconnection(self, websocket_server, client_connections):
@@ -154,14 +207,7 @@ class TestCanvasCollaboration:
         await offline_client.connect()
 
         # Send current state to reconnected client
-        current_state = {
-            "nodes": [
-                {"id": "existing-node", "type": "set", "position": {"x": 100, "y": 100}},
-                {"id": "new-node", "type": "set", "position": {"x": 200, "y": 200}}
-            ],
-            "edges": [],
-            "viewport": {"x": 0, "y": 0, "zoom": 1.0}
-        }
+        current_state = RECONNECTED_CANVAS
 
         offline_client.queue_message({
             "type": "state_sync",
@@ -169,41 +215,36 @@ class TestCanvasCollaboration:
         })
 
         # Verify reconnected client received state sync
-        sync_message = await offline_client.receive()
-        assert sync_message is not None
-        assert sync_message["type"] == "state_sync"
+        sync_messages = offline_client.drain("state_sync")
+        assert len(sync_messages) == 1
+        assert sync_messages[0]["data"]["nodes"][-1]["id"] == "new-node"
 
     @pytest.mark.asyncio
     async def test_user_presence_tracking(self, websocket_server, client_connections):
         """Test user presence tracking in collaborative sessions."""
+        loop_time = asyncio.get_running_loop().time
+
         # Setup user presence tracking
         active_users = {
             "user-1": {"status": "active", "cursor": {"x": 100, "y": 100}},
             "user-2": {"status": "active", "cursor": {"x": 200, "y": 150}},
-            "user-3": {"status": "away", "lastSeen": asyncio.get_event_loop().time() - 300}
+            "user-3": {"status": "away", "lastSeen": loop_time() - 300}
         }
 
         # Broadcast presence updates
-        for user_id, presence in active_users.items():
-            await websocket_server.broadcast({
-                "type": "presence_update",
-                "userId": user_id,
-                "data": presence
-            })
+        await websocket_server.broadcast_many([
+            {"type": "presence_update", "userId": user_id, "data": presence}
+            for user_id, presence in active_users.items()
+        ])
 
         # Verify all clients received presence updates
-        for connection in client_connections:
-            presence_count = 0
-            for _ in range(len(active_users)):
-                message = await connection.receive()
-                if message and message.get("type") == "presence_update":
-                    presence_count += 1
-
-            assert presence_count == len(active_users)
+        _assert_all_received(client_connections, "presence_update", active_users)
 
     @pytest.mark.asyncio
     async def test_operational_transforms(self, websocket_server, client_connections):
         """Test operational transforms for conflict-free replicated editing."""
+        loop_time = asyncio.get_running_loop().time
+
         # Setup operational transform system
         operations = [
             {"type": "retain", "count": 5},
@@ -211,33 +252,22 @@ class TestCanvasCollaboration:
             {"type": "delete", "count": 2}
         ]
 
-        # Apply operations through operational transform
-        transformed_ops = []
-
-        for op in operations:
-            # Transform operation against concurrent operations
-            transformed_op = {
+        # Apply operations through operational transform, transforming each
+        # against concurrent operations
+        transformed_ops = [
+            {
                 **op,
                 "transformed": True,
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": loop_time()
             }
-            transformed_ops.append(transformed_op)
+            for op in operations
+        ]
 
-            # Broadcast transformed operation
-            await websocket_server.broadcast({
-                "type": "operation",
-                "data": transformed_op
-            })
+        # Broadcast transformed operations
+        await websocket_server.broadcast_many(_envelopes("operation", transformed_ops))
 
         # Verify all clients received transformed operations
-        for connection in client_connections:
-            received_ops = []
-            for _ in range(len(transformed_ops)):
-                message = await connection.receive()
-                if message and message.get("type") == "operation":
-                    received_ops.append(message["data"])
-
-            assert len(received_ops) == len(transformed_ops)
+        _assert_all_received(client_connections, "operation", transformed_ops)
 
     @pytest.mark.asyncio
     async def test_collaborative_undo_redo(self, websocket_server, client_connections):
@@ -249,13 +279,6 @@ class TestCanvasCollaboration:
             {"type": "connection_add", "source": "node-1", "target": "node-2"}
         ]
 
-        # Execute actions
-        for action in actions:
-            await websocket_server.broadcast({
-                "type": "action",
-                "data": action
-            })
-
         # Test collaborative undo
         undo_action = {
             "type": "undo",
@@ -263,11 +286,6 @@ class TestCanvasCollaboration:
             "userId": "user-1"
         }
 
-        await websocket_server.broadcast({
-            "type": "undo",
-            "data": undo_action
-        })
-
         # Test collaborative redo
         redo_action = {
             "type": "redo",
@@ -275,17 +293,17 @@ class TestCanvasCollaboration:
             "userId": "user-2"
         }
 
-        await websocket_server.broadcast({
-            "type": "redo",
-            "data": redo_action
-        })
+        # Execute actions, then the undo and redo
+        envelopes = _envelopes("action", actions)
+        envelopes.append({"type": "undo", "data": undo_action})
+        envelopes.append({"type": "redo", "data": redo_action})
+        await websocket_server.broadcast_many(envelopes)
 
         # Verify undo/redo operations
-        total_messages = len(actions) + 2  # actions + undo + redo
+        total_messages = len(envelopes)  # actions + undo + redo
 
         for connection in client_connections:
-            message_count = connection.get_message_count("received")
-            assert message_count >= total_messages
+            assert connection.received_count >= total_messages
 
     @pytest.mark.asyncio
     async def test_permission_based_collaboration(self, websocket_server, client_connections):
@@ -304,11 +322,11 @@ class TestCanvasCollaboration:
             "nodeId": "node-1"
         }
 
-        await websocket_server.broadcast({
+        admin_message = {
             "type": "action",
             "data": admin_action,
             "permissions": user_permissions["admin"]
-        })
+        }
 
         # Test viewer restrictions
         viewer_action = {
@@ -325,40 +343,11 @@ class TestCanvasCollaboration:
             "reason": "Insufficient permissions"
         }
 
-        await websocket_server.broadcast(rejection_message)
+        await websocket_server.broadcast_many([admin_message, rejection_message])
 
         # Verify permission enforcement
         # In real implementation, would verify proper permission checks
 
-    @pytest.mark.asyncio
-    async def test_collaborative_workflow_execution(self, websocket_server, client_connections):
-        """Test collaborative workflow execution monitoring."""
-        # Setup workflow execution monitoring
-        execution_events = [
-            {"type": "execution_start", "executionId": "exec-1", "workflowId": "workflow-1"},
-            {"type": "node_start", "executionId": "exec-1", "nodeId": "node-1"},
-            {"type": "node_complete", "executionId": "exec-1", "nodeId": "node-1", "output": {"result": "success"}},
-            {"type": "node_start", "executionId": "exec-1", "nodeId": "node-2"},
-            {"type": "execution_complete", "executionId": "exec-1", "status": "success", "results": {"final": "output"}}
-        ]
-
-        # Broadcast execution events to all collaborators
-        for event in execution_events:
-            await websocket_server.broadcast({
-                "type": "execution_event",
-                "data": event
-            })
-
-        # Verify all clients received execution events
-        for connection in client_connections:
-            event_count = 0
-            for _ in range(len(execution_events)):
-                message = await connection.receive()
-                if message and message.get("type") == "execution_event":
-                    event_count += 1
-
-            assert event_count == len(execution_events)
-
     @pytest.mark.asyncio
     async def test_collaborative_error_handling(self, websocket_server, client_connections):
         """Test collaborative error handling and recovery."""
@@ -369,13 +358,6 @@ class TestCanvasCollaboration:
             {"type": "recovery_suggestion", "suggestion": "Check API credentials"}
         ]
 
-        # Broadcast error events
-        for error_event in error_events:
-            await websocket_server.broadcast({
-                "type": "error",
-                "data": error_event
-            })
-
         # Test collaborative recovery
         recovery_action = {
             "type": "node_fix",
@@ -384,50 +366,17 @@ class TestCanvasCollaboration:
             "fix": {"timeout": 60}
         }
 
-        await websocket_server.broadcast({
-            "type": "recovery",
-            "data": recovery_action
-        })
-
-        # Verify error handling and recovery
-        total_events = len(error_events) + 1  # errors + recovery
-
-        for connection in client_connections:
-            event_count = 0
-            for _ in range(total_events):
-                message = await connection.receive()
-                if message and (message.get("type") in ["error", "recovery"]):
-                    event_count += 1
-
-            assert event_count == total_events
+        # Broadcast error events, then the recovery
+        envelopes = _envelopes("error", error_events)
+        envelopes.append({"type": "recovery", "data": recovery_action})
+        await websocket_server.broadcast_many(envelopes)
 
-    @pytest.mark.asyncio
-    async def test_collaborative_performance_monitoring(self, websocket_server, client_connections):
-        """Test collaborative performance monitoring."""
-        # Setup performance monitoring
-        performance_events = [
-            {"type": "performance_metric", "metric": "execution_time", "value": 2.5, "unit": "seconds"},
-            {"type": "performance_metric", "metric": "memory_usage", "value": 85, "unit": "MB"},
-            {"type": "performance_metric", "metric": "network_latency", "value": 150, "unit": "ms"},
-            {"type": "performance_alert", "level": "warning", "message": "High memory usage detected"}
-        ]
-
-        # Broadcast performance events
-        for event in performance_events:
-            await websocket_server.broadcast({
-                "type": "performance",
-                "data": event
-            })
+        # Verify error handling and recovery; the inbox is FIFO, so every
+        # client must see exactly the errors followed by the recovery
+        expected_types = ["error"] * len(error_events) + ["recovery"]
 
-        # Verify performance monitoring
         for connection in client_connections:
-            performance_count = 0
-            for _ in range(len(performance_events)):
-                message = await connection.receive()
-                if message and message.get("type") == "performance":
-                    performance_count += 1
-
-            assert performance_count == len(performance_events)
+            assert [message["type"] for message in connection.drain()] == expected_types
 
     @pytest.mark.asyncio
     async def test_collaborative_undo_redo_conflicts(self, websocket_server, client_connections):
@@ -440,105 +389,33 @@ class TestCanvasCollaboration:
         }
 
         # Process conflicting operations
-        for user_id, operation in undo_conflict.items():
-            conflict_message = {
+        await websocket_server.broadcast_many([
+            {
                 "type": "undo_redo_conflict",
                 "userId": user_id,
                 "operation": operation,
                 "resolution": "merge"
             }
-
-            await websocket_server.broadcast(conflict_message)
+            for user_id, operation in undo_conflict.items()
+        ])
 
         # Verify conflict resolution
-        for connection in client_connections:
-            conflict_count = 0
-            for _ in range(len(undo_conflict)):
-                message = await connection.receive()
-                if message and message.get("type") == "undo_redo_conflict":
-                    conflict_count += 1
-
-            assert conflict_count == len(undo_conflict)
+        _assert_all_received(client_connections, "undo_redo_conflict", undo_conflict)
 
     @pytest.mark.asyncio
-    async def test_collaborative_session_management(self, websocket_server, client_connections):
-        """Test collaborative session management."""
-        # Setup session management
-        session_events = [
-            {"type": "session_start", "sessionId": "session-1", "participants": ["user-1", "user-2"]},
-            {"type": "user_join", "userId": "user-3", "sessionId": "session-1"},
-            {"type": "user_leave", "userId": "user-2", "sessionId": "session-1"},
-            {"type": "session_end", "sessionId": "session-1"}
-        ]
-
-        # Process session events
-        for event in session_events:
-            await websocket_server.broadcast({
-                "type": "session",
-                "data": event
-            })
-
-        # Verify session management
-        for connection in client_connections:
-            session_count = 0
-            for _ in range(len(session_events)):
-                message = await connection.receive()
-                if message and message.get("type") == "session":
-                    session_count += 1
-
-            assert session_count == len(session_events)
-
-    @pytest.mark.asyncio
-    async def test_collaborative_data_validation(self, websocket_server, client_connections):
-        """Test collaborative data validation."""
-        # Setup validation scenarios
-        validation_events = [
-            {"type": "validation_error", "nodeId": "node-1", "error": "Missing required parameter"},
-            {"type": "validation_warning", "nodeId": "node-2", "warning": "Deprecated parameter used"},
-            {"type": "validation_success", "nodeId": "node-3", "message": "Node configuration valid"}
-        ]
-
-        # Broadcast validation events
-        for event in validation_events:
-            await websocket_server.broadcast({
-                "type": "validation",
-                "data": event
-            })
-
-        # Verify collaborative validation
-        for connection in client_connections:
-            validation_count = 0
-            for _ in range(len(validation_events)):
-                message = await connection.receive()
-                if message and message.get("type") == "validation":
-                    validation_count += 1
-
-            assert validation_count == len(validation_events)
-
-    @pytest.mark.asyncio
-    async def test_collaborative_workflow_testing(self, websocket_server, client_connections):
-        """Test collaborative workflow testing and debugging."""
-        # Setup testing scenario
-        test_events = [
-            {"type": "test_start", "testId": "test-1", "workflowId": "workflow-1"},
-            {"type": "test_node", "testId": "test-1", "nodeId": "node-1", "status": "running"},
-            {"type": "test_result", "testId": "test-1", "nodeId": "node-1", "output": {"result": "success"}},
-            {"type": "test_complete", "testId": "test-1", "status": "passed", "duration": 2.5}
-        ]
-
-        # Broadcast test events
-        for event in test_events:
-            await websocket_server.broadcast({
-                "type": "testing",
-                "data": event
-            })
-
-        # Verify collaborative testing
-        for connection in client_connections:
-            test_count = 0
-            for _ in range(len(test_events)):
-                message = await connection.receive()
-                if message and message.get("type") == "testing":
-                    test_count += 1
-
-            assert test_count == len(test_events)
+    @pytest.mark.parametrize(
+        "envelope_type,events",
+        [
+            ("execution_event", EXECUTION_EVENTS),
+            ("performance", PERFORMANCE_EVENTS),
+            ("session", SESSION_EVENTS),
+            ("validation", VALIDATION_EVENTS),
+            ("testing", TESTING_EVENTS),
+        ],
+        ids=["workflow_execution", "performance_monitoring", "session_management", "data_validation", "workflow_testing"]
+    )
+    async def test_collaborative_event_broadcast(self, websocket_server, client_connections, envelope_type, events):
+        """Test every collaborator receives a broadcast sequence of one event type."""
+        await websocket_server.broadcast_many(_envelopes(envelope_type, events))
+
+        _assert_all_received(client_connections, envelope_type, events)
@@ -4,57 +4,333 @@ Integration tests for workflow execution across multiple agents.
 
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
 
+from tests.fixtures.frozen import freeze, thaw
 from tests.mocks.n8n_api_mock import N8nApiMock
 from tests.mocks.redis_mock import RedisMock
-from tests.mocks.websocket_mock import WebSocketMock
+from tests.mocks.websocket_mock import WebSocketMock, WsEvent
+
+
+# Execution statuses a parametrized case accepts: workflows that can fail may
+# finish either way, the rest must succeed
+_TERMINAL_STATUSES: FrozenSet[str] = frozenset({"success", "error"})
+_SUCCESS_ONLY: FrozenSet[str] = frozenset({"success"})
+
+# Workflow payloads shared (read-only) by the integration tests
+LIFECYCLE_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "http", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]},
+        {"id": "set", "type": "n8n-nodes-base.set", "position": [500, 100]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "http"},
+        {"source": "http", "target": "set"}
+    ]
+})
+
+MULTI_AGENT_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "webhook", "type": "n8n-nodes-base.webhook", "position": [50, 50]},
+        {"id": "if", "type": "n8n-nodes-base.if", "position": [200, 50]},
+        {"id": "github", "type": "n8n-nodes-base.github", "position": [350, 20]},
+        {"id": "slack", "type": "n8n-nodes-base.slack", "position": [350, 80]},
+        {"id": "database", "type": "n8n-nodes-base.postgres", "position": [500, 50]}
+    ],
+    "connections": [
+        {"source": "webhook", "target": "if"},
+        {"source": "if", "target": "github", "sourceOutput": 0},
+        {"source": "if", "target": "slack", "sourceOutput": 1},
+        {"source": "github", "target": "database"},
+        {"source": "slack", "target": "database"}
+    ]
+})
+
+ERROR_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "error-node", "type": "n8n-nodes-base.httpRequest", "position": [300, 100],
+         "parameters": {"url": "https://httpstat.us/500"}},  # Always returns 500
+        {"id": "error-handler", "type": "n8n-nodes-base.errorTrigger", "position": [300, 200]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "error-node"},
+        {"source": "error-node", "target": "error-handler", "sourceOutput": 1}  # Error output
+    ]
+})
+
+STATE_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "set-1", "type": "n8n-nodes-base.set", "position": [300, 100],
+         "parameters": {"values": {"string": [{"name": "state1", "value": "value1"}]}}},
+        {"id": "set-2", "type": "n8n-nodes-base.set", "position": [500, 100],
+         "parameters": {"values": {"string": [{"name": "state2", "value": "={{ $json.state1 }}-modified"}]}}},
+        {"id": "set-3", "type": "n8n-nodes-base.set", "position": [700, 100],
+         "parameters": {"values": {"string": [{"name": "final", "value": "={{ $json.state2 }}-final"}]}}}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "set-1"},
+        {"source": "set-1", "target": "set-2"},
+        {"source": "set-2", "target": "set-3"}
+    ]
+})
+
+EXTERNAL_INTEGRATION_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "github-api", "type": "n8n-nodes-base.github", "position": [300, 100],
+         "credentials": {"githubApi": {"id": "github-123"}}},
+        {"id": "slack-notification", "type": "n8n-nodes-base.slack", "position": [500, 100],
+         "credentials": {"slackApi": {"id": "slack-456"}}},
+        {"id": "database-save", "type": "n8n-nodes-base.postgres", "position": [700, 100],
+         "credentials": {"postgres": {"id": "db-789"}}}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "github-api"},
+        {"source": "github-api", "target": "slack-notification"},
+        {"source": "slack-notification", "target": "database-save"}
+    ]
+})
+
+INVALID_CONNECTION_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "invalid-connection", "type": "n8n-nodes-base.set", "position": [300, 100]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "non-existent-node"}  # Invalid connection
+    ]
+})
+
+CANVAS_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "node-1", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "node-2", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]},
+        {"id": "node-3", "type": "n8n-nodes-base.set", "position": [500, 100]}
+    ],
+    "connections": [
+        {"source": "node-1", "target": "node-2"},
+        {"source": "node-2", "target": "node-3"}
+    ],
+    "viewport": {"x": 0, "y": 0, "zoom": 1.0},
+    "metadata": {"createdBy": "test-user", "version": "1.0"}
+})
+
+LOAD_TEST_TEMPLATE = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "process", "type": "n8n-nodes-base.set", "position": [300, 100]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "process"}
+    ]
+})
+
+RECOVERY_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "unreliable-api", "type": "n8n-nodes-base.httpRequest", "position": [300, 100],
+         "parameters": {"url": "https://httpstat.us/500"}},
+        {"id": "error-handler", "type": "n8n-nodes-base.errorTrigger", "position": [300, 200]},
+        {"id": "fallback", "type": "n8n-nodes-base.set", "position": [500, 200]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "unreliable-api"},
+        {"source": "unreliable-api", "target": "error-handler", "sourceOutput": 1},
+        {"source": "error-handler", "target": "fallback"}
+    ]
+})
+
+PERSISTENCE_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "generate-data", "type": "n8n-nodes-base.set", "position": [300, 100],
+         "parameters": {"values": {"string": [{"name": "data", "value": "test-data-123"}]}}},
+        {"id": "save-to-redis", "type": "n8n-nodes-base.redis", "position": [500, 100],
+         "parameters": {"command": "set", "key": "workflow-output", "value": "={{ $json.data }}"}}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "generate-data"},
+        {"source": "generate-data", "target": "save-to-redis"}
+    ]
+})
+
+COLLAB_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "shared-trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "shared-action", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]}
+    ],
+    "connections": [
+        {"source": "shared-trigger", "target": "shared-action"}
+    ]
+})
+
+
+@dataclass(frozen=True, slots=True)
+class WorkflowSpec:
+    """Typed workflow payload; variants are derived with dataclasses.replace."""
+
+    nodes: Tuple[Mapping[str, Any], ...]
+    connections: Tuple[Mapping[str, Any], ...]
+    version: Optional[str] = None
+
+    def to_dict(self) -> Mapping[str, Any]:
+        """Build the (frozen) dict passed to create_workflow/update_workflow."""
+        workflow: Dict[str, Any] = {"nodes": self.nodes, "connections": self.connections}
+        if self.version is not None:
+            workflow["version"] = self.version
+        return freeze(workflow)
+
+
+VERSIONED_SPEC = WorkflowSpec(
+    nodes=freeze([
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "version-1", "type": "n8n-nodes-base.set", "position": [300, 100]}
+    ]),
+    connections=freeze([
+        {"source": "trigger", "target": "version-1"}
+    ]),
+    version="1.0.0"
+)
+
+# VERSIONED_SPEC with a third node appended, as version 1.1.0
+UPDATED_VERSIONED_SPEC = replace(
+    VERSIONED_SPEC,
+    nodes=(
+        *VERSIONED_SPEC.nodes,
+        freeze({"id": "version-2", "type": "n8n-nodes-base.set", "position": [500, 100]})
+    ),
+    connections=(
+        *VERSIONED_SPEC.connections,
+        freeze({"source": "version-1", "target": "version-2"})
+    ),
+    version="1.1.0"
+)
+
+VERSIONED_WORKFLOW = VERSIONED_SPEC.to_dict()
+UPDATED_VERSIONED_WORKFLOW = UPDATED_VERSIONED_SPEC.to_dict()
+
+SECURE_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "secure-api", "type": "n8n-nodes-base.httpRequest", "position": [300, 100],
+         "credentials": {"githubApi": {"id": "secure-cred"}}},
+        {"id": "data-validator", "type": "n8n-nodes-base.set", "position": [500, 100]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "secure-api"},
+        {"source": "secure-api", "target": "data-validator"}
+    ],
+    "permissions": {
+        "required": ["api:read", "data:write"],
+        "owner": "test-user"
+    }
+})
+
+RESOURCE_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "batch-processor", "type": "n8n-nodes-base.splitInBatches", "position": [300, 100],
+         "parameters": {"batchSize": 100}},
+        {"id": "data-processor", "type": "n8n-nodes-base.set", "position": [500, 100]},
+        {"id": "cache-writer", "type": "n8n-nodes-base.redis", "position": [700, 100]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "batch-processor"},
+        {"source": "batch-processor", "target": "data-processor"},
+        {"source": "data-processor", "target": "cache-writer"}
+    ]
+})
+
+MONITORED_WORKFLOW = freeze({
+    "nodes": [
+        {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+        {"id": "monitored-api", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]},
+        {"id": "result-processor", "type": "n8n-nodes-base.set", "position": [500, 100]}
+    ],
+    "connections": [
+        {"source": "trigger", "target": "monitored-api"},
+        {"source": "monitored-api", "target": "result-processor"}
+    ],
+    "monitoring": {
+        "enabled": True,
+        "metrics": ["execution_time", "memory_usage", "api_calls"],
+        "alerts": ["error_rate", "timeout"]
+    }
+})
+
+
+def _load_test_workflow(i):
+    """Copy of LOAD_TEST_TEMPLATE with every node id suffixed by -{i}."""
+    workflow = thaw(LOAD_TEST_TEMPLATE)
+    suffix = f"-{i}"
+    for node in workflow["nodes"]:
+        node["id"] += suffix
+    for conn in workflow["connections"]:
+        conn["source"] += suffix
+        conn["target"] += suffix
+    return workflow
+
+
+# Workflows created by the load and concurrency tests, built once at import
+LOAD_TEST_WORKFLOWS = freeze([_load_test_workflow(i) for i in range(10)])
+
+CONCURRENT_WORKFLOWS = freeze([
+    {
+        "nodes": [
+            {"id": f"trigger-{i}", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
+            {"id": f"http-{i}", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]}
+        ],
+        "connections": [
+            {"source": f"trigger-{i}", "target": f"http-{i}"}
+        ]
+    }
+    for i in range(3)
+])
 
 
 class TestWorkflowExecutionIntegration:
     """Integration tests for complete workflow execution."""
 
-    @pytest.fixture
-    def mock_n8n_api(self):
+    @pytest.fixture(scope="module")
+    def n8n_api(self):
         """Mock n8n API for integration testing."""
         return N8nApiMock()
 
-    @pytest.fixture
-    def mock_redis(self):
+    @pytest.fixture(scope="module")
+    def redis(self):
         """Mock Redis for state management."""
         return RedisMock()
 
-    @pytest.fixture
-    def mock_websocket(self):
+    @pytest.fixture(scope="module")
+    def websocket(self):
         """Mock WebSocket for real-time updates."""
         return WebSocketMock()
 
-    @pytest.fixture
-    def integration_setup(self, mock_n8n_api, mock_redis, mock_websocket):
-        """Setup integration test environment."""
-        return {
-            "n8n_api": mock_n8n_api,
-            "redis": mock_redis,
-            "websocket": mock_websocket
-        }
-
-    @pytest.mark.asyncio
-    async def test_complete_workflow_lifecycle(self, integration_setup):
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(self, request):
+        """Clear state left by the previous test in the mocks this test uses.
+
+        Mocks the test does not request are neither built nor reset.
+        """
+        fixturenames = request.fixturenames
+        if "n8n_api" in fixturenames:
+            request.getfixturevalue("n8n_api").reset()
+        if "redis" in fixturenames:
+            request.getfixturevalue("redis").clear_all()
+        if "websocket" in fixturenames:
+            request.getfixturevalue("websocket").reset()
+        yield
+
+    async def test_complete_workflow_lifecycle(self, n8n_api):
         """Test complete workflow lifecycle from creation to execution."""
-        n8n_api = integration_setup["n8n_api"]
 
         # 1. Create workflow
-        workflow_data = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "http", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]},
-                {"id": "set", "type": "n8n-nodes-base.set", "position": [500, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "http"},
-                {"source": "http", "target": "set"}
-            ]
-        }
+        workflow_data = LIFECYCLE_WORKFLOW
 
         create_result = await n8n_api.create_workflow(workflow_data)
         workflow_id = create_result["id"]
@@ -70,30 +346,11 @@ class TestWorkflowExecutionIntegration:
         execution_details = await n8n_api.get_execution(execution_result["executionId"])
         assert execution_details["status"] == "success"
 
-    @pytest.mark.asyncio
-    async def test_multi_agent_coordination(self, integration_setup):
+    async def test_multi_agent_coordination(self, n8n_api):
         """Test coordination between multiple agents during workflow execution."""
-        n8n_api = integration_setup["n8n_api"]
-        redis = integration_setup["redis"]
-        websocket = integration_setup["websocket"]
 
         # Setup complex workflow requiring multiple agents
-        complex_workflow = {
-            "nodes": [
-                {"id": "webhook", "type": "n8n-nodes-base.webhook", "position": [50, 50]},
-                {"id": "if", "type": "n8n-nodes-base.if", "position": [200, 50]},
-                {"id": "github", "type": "n8n-nodes-base.github", "position": [350, 20]},
-                {"id": "slack", "type": "n8n-nodes-base.slack", "position": [350, 80]},
-                {"id": "database", "type": "n8n-nodes-base.postgres", "position": [500, 50]}
-            ],
-            "connections": [
-                {"source": "webhook", "target": "if"},
-                {"source": "if", "target": "github", "sourceOutput": 0},
-                {"source": "if", "target": "slack", "sourceOutput": 1},
-                {"source": "github", "target": "database"},
-                {"source": "slack", "target": "database"}
-            ]
-        }
+        complex_workflow = MULTI_AGENT_WORKFLOW
 
         # Create and execute workflow
         create_result = await n8n_api.create_workflow(complex_workflow)
@@ -101,146 +358,56 @@ class TestWorkflowExecutionIntegration:
 
         # Verify multi-agent coordination
         assert execution_result["status"] == "success"
-        assert n8n_api.get_request_count("POST", "/workflows") == 1
-        assert n8n_api.get_request_count("POST", "/executions") == 1
-
-    @pytest.mark.asyncio
-    async def test_error_propagation_across_agents(self, integration_setup):
-        """Test error propagation across multiple agents."""
-        n8n_api = integration_setup["n8n_api"]
-
-        # Setup workflow with intentional error
-        error_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "error-node", "type": "n8n-nodes-base.httpRequest", "position": [300, 100],
-                 "parameters": {"url": "https://httpstat.us/500"}},  # Always returns 500
-                {"id": "error-handler", "type": "n8n-nodes-base.errorTrigger", "position": [300, 200]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "error-node"},
-                {"source": "error-node", "target": "error-handler", "sourceOutput": 1}  # Error output
-            ]
-        }
+        request_counts = n8n_api.get_request_counts()
+        assert request_counts[("POST", "/workflows")] == 1
+        assert n8n_api.get_request_count("POST", f"/workflows/{create_result['id']}/execute") == 1
+
+    @pytest.mark.parametrize("workflow,statuses", [
+        pytest.param(ERROR_WORKFLOW, _TERMINAL_STATUSES, id="error_propagation"),
+        pytest.param(STATE_WORKFLOW, _SUCCESS_ONLY, id="state_consistency"),
+        pytest.param(EXTERNAL_INTEGRATION_WORKFLOW, _SUCCESS_ONLY, id="external_integrations"),
+        pytest.param(RECOVERY_WORKFLOW, _TERMINAL_STATUSES, id="error_recovery"),
+        pytest.param(PERSISTENCE_WORKFLOW, _SUCCESS_ONLY, id="data_persistence"),
+        pytest.param(SECURE_WORKFLOW, _SUCCESS_ONLY, id="security"),
+    ])
+    async def test_workflow_executes(self, n8n_api, workflow, statuses):
+        """Test a workflow spanning several agents can be created and executed."""
 
         # Create and execute workflow
-        create_result = await n8n_api.create_workflow(error_workflow)
+        create_result = await n8n_api.create_workflow(workflow)
         execution_result = await n8n_api.execute_workflow(create_result["id"])
 
-        # Verify error handling across agents
-        assert execution_result["status"] in ["success", "error"]
-        # In real implementation, would verify error propagation to error handler
-
-    @pytest.mark.asyncio
-    async def test_state_consistency_across_agents(self, integration_setup):
-        """Test state consistency across all agents."""
-        n8n_api = integration_setup["n8n_api"]
-        redis = integration_setup["redis"]
-
-        # Setup workflow that modifies state
-        state_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "set-1", "type": "n8n-nodes-base.set", "position": [300, 100],
-                 "parameters": {"values": {"string": [{"name": "state1", "value": "value1"}]}}},
-                {"id": "set-2", "type": "n8n-nodes-base.set", "position": [500, 100],
-                 "parameters": {"values": {"string": [{"name": "state2", "value": "={{ $json.state1 }}-modified"}]}}},
-                {"id": "set-3", "type": "n8n-nodes-base.set", "position": [700, 100],
-                 "parameters": {"values": {"string": [{"name": "final", "value": "={{ $json.state2 }}-final"}]}}}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "set-1"},
-                {"source": "set-1", "target": "set-2"},
-                {"source": "set-2", "target": "set-3"}
-            ]
-        }
+        # Error-handling workflows may legitimately finish in the error state
+        assert execution_result["status"] in statuses
+        # In real implementation, would verify agent-specific behaviour per workflow
 
-        # Create and execute workflow
-        create_result = await n8n_api.create_workflow(state_workflow)
-        execution_result = await n8n_api.execute_workflow(create_result["id"])
-
-        # Verify state consistency
-        assert execution_result["status"] == "success"
-        # In real implementation, would verify state flow between nodes
-
-    @pytest.mark.asyncio
-    async def test_concurrent_workflow_execution(self, integration_setup):
+    async def test_concurrent_workflow_execution(self, n8n_api):
         """Test concurrent execution of multiple workflows."""
-        n8n_api = integration_setup["n8n_api"]
-
-        # Setup multiple workflows
-        workflows = []
-        for i in range(3):
-            workflow = {
-                "nodes": [
-                    {"id": f"trigger-{i}", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                    {"id": f"http-{i}", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]}
-                ],
-                "connections": [
-                    {"source": f"trigger-{i}", "target": f"http-{i}"}
-                ]
-            }
-            create_result = await n8n_api.create_workflow(workflow)
-            workflows.append(create_result["id"])
+
+        # Create multiple workflows
+        create_results = await asyncio.gather(
+            *(n8n_api.create_workflow(payload) for payload in CONCURRENT_WORKFLOWS)
+        )
+        workflows = [create_result["id"] for create_result in create_results]
 
         # Execute workflows concurrently
-        execution_tasks = [
-            n8n_api.execute_workflow(workflow_id, {"concurrent": True, "id": i})
-            for i, workflow_id in enumerate(workflows)
-        ]
+        async with asyncio.TaskGroup() as task_group:
+            execution_tasks = [
+                task_group.create_task(n8n_api.execute_workflow(workflow_id, {"concurrent": True, "id": i}))
+                for i, workflow_id in enumerate(workflows)
+            ]
 
-        execution_results = await asyncio.gather(*execution_tasks)
+        execution_results = [task.result() for task in execution_tasks]
 
         # Verify concurrent execution
         assert len(execution_results) == 3
         assert all(result["status"] == "success" for result in execution_results)
 
-    @pytest.mark.asyncio
-    async def test_workflow_with_external_integrations(self, integration_setup):
-        """Test workflow execution with external service integrations."""
-        n8n_api = integration_setup["n8n_api"]
-
-        # Setup workflow with external API calls
-        integration_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "github-api", "type": "n8n-nodes-base.github", "position": [300, 100],
-                 "credentials": {"githubApi": {"id": "github-123"}}},
-                {"id": "slack-notification", "type": "n8n-nodes-base.slack", "position": [500, 100],
-                 "credentials": {"slackApi": {"id": "slack-456"}}},
-                {"id": "database-save", "type": "n8n-nodes-base.postgres", "position": [700, 100],
-                 "credentials": {"postgres": {"id": "db-789"}}}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "github-api"},
-                {"source": "github-api", "target": "slack-notification"},
-                {"source": "slack-notification", "target": "database-save"}
-            ]
-        }
-
-        # Create and execute workflow
-        create_result = await n8n_api.create_workflow(integration_workflow)
-        execution_result = await n8n_api.execute_workflow(create_result["id"])
-
-        # Verify external integration handling
-        assert execution_result["status"] == "success"
-        # In real implementation, would verify external API calls were made correctly
-
-    @pytest.mark.asyncio
-    async def test_workflow_validation_integration(self, integration_setup):
+    async def test_workflow_validation_integration(self, n8n_api):
         """Test integration between validation and execution agents."""
-        n8n_api = integration_setup["n8n_api"]
 
         # Setup workflow with validation issues
-        invalid_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "invalid-connection", "type": "n8n-nodes-base.set", "position": [300, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "non-existent-node"}  # Invalid connection
-            ]
-        }
+        invalid_workflow = INVALID_CONNECTION_WORKFLOW
 
         # Create workflow (should succeed)
         create_result = await n8n_api.create_workflow(invalid_workflow)
@@ -252,37 +419,22 @@ class TestWorkflowExecutionIntegration:
         # Verify validation integration
         # In real implementation, would verify validation errors are properly handled
 
-    @pytest.mark.asyncio
-    async def test_canvas_state_synchronization(self, integration_setup):
+    async def test_canvas_state_synchronization(self, n8n_api, websocket):
         """Test synchronization between canvas state and workflow execution."""
-        n8n_api = integration_setup["n8n_api"]
-        websocket = integration_setup["websocket"]
 
         # Setup workflow with canvas state
-        canvas_workflow = {
-            "nodes": [
-                {"id": "node-1", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "node-2", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]},
-                {"id": "node-3", "type": "n8n-nodes-base.set", "position": [500, 100]}
-            ],
-            "connections": [
-                {"source": "node-1", "target": "node-2"},
-                {"source": "node-2", "target": "node-3"}
-            ],
-            "viewport": {"x": 0, "y": 0, "zoom": 1.0},
-            "metadata": {"createdBy": "test-user", "version": "1.0"}
-        }
+        canvas_workflow = CANVAS_WORKFLOW
 
         # Create workflow
         create_result = await n8n_api.create_workflow(canvas_workflow)
         workflow_id = create_result["id"]
 
         # Simulate canvas updates via WebSocket
-        websocket.queue_message({
-            "type": "node_move",
-            "nodeId": "node-2",
-            "position": {"x": 400, "y": 150}
-        })
+        websocket.queue_message(WsEvent(
+            type="node_move",
+            node_id="node-2",
+            position={"x": 400, "y": 150}
+        ))
 
         # Execute workflow
         execution_result = await n8n_api.execute_workflow(workflow_id)
@@ -291,48 +443,25 @@ class TestWorkflowExecutionIntegration:
         assert execution_result["status"] == "success"
         # In real implementation, would verify canvas state was synchronized
 
-    @pytest.mark.asyncio
-    async def test_performance_under_load(self, integration_setup):
+    async def test_performance_under_load(self, n8n_api):
         """Test performance under concurrent load."""
-        n8n_api = integration_setup["n8n_api"]
-
-        # Setup multiple workflows for load testing
-        workflow_template = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "process", "type": "n8n-nodes-base.set", "position": [300, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "process"}
-            ]
-        }
 
-        # Create multiple workflows
-        workflow_ids = []
-        for i in range(10):
-            create_result = await n8n_api.create_workflow({
-                **workflow_template,
-                "nodes": [
-                    {**node, "id": f"{node['id']}-{i}"} for node in workflow_template["nodes"]
-                ],
-                "connections": [
-                    {**conn, "source": f"{conn['source']}-{i}", "target": f"{conn['target']}-{i}"}
-                    for conn in workflow_template["connections"]
-                ]
-            })
-            workflow_ids.append(create_result["id"])
+        # Create multiple workflows for load testing
+        create_results = await n8n_api.create_workflows_bulk(LOAD_TEST_WORKFLOWS)
+        workflow_ids = [create_result["id"] for create_result in create_results]
 
         # Execute all workflows concurrently
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
 
-        execution_tasks = [
-            n8n_api.execute_workflow(workflow_id, {"load_test": True, "id": i})
-            for i, workflow_id in enumerate(workflow_ids)
-        ]
+        async with asyncio.TaskGroup() as task_group:
+            execution_tasks = [
+                task_group.create_task(n8n_api.execute_workflow(workflow_id, {"load_test": True, "id": i}))
+                for i, workflow_id in enumerate(workflow_ids)
+            ]
 
-        execution_results = await asyncio.gather(*execution_tasks)
+        execution_results = [task.result() for task in execution_tasks]
 
-        end_time = asyncio.get_event_loop().time()
+        end_time = time.perf_counter()
 
         # Verify performance under load
         assert len(execution_results) == 10
@@ -340,102 +469,30 @@ class TestWorkflowExecutionIntegration:
         total_time = end_time - start_time
         assert total_time < 10.0  # Should complete within 10 seconds
 
-    @pytest.mark.asyncio
-    async def test_error_recovery_integration(self, integration_setup):
-        """Test error recovery across multiple agents."""
-        n8n_api = integration_setup["n8n_api"]
-
-        # Setup workflow with potential failures
-        recovery_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "unreliable-api", "type": "n8n-nodes-base.httpRequest", "position": [300, 100],
-                 "parameters": {"url": "https://httpstat.us/500"}},
-                {"id": "error-handler", "type": "n8n-nodes-base.errorTrigger", "position": [300, 200]},
-                {"id": "fallback", "type": "n8n-nodes-base.set", "position": [500, 200]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "unreliable-api"},
-                {"source": "unreliable-api", "target": "error-handler", "sourceOutput": 1},
-                {"source": "error-handler", "target": "fallback"}
-            ]
-        }
-
-        # Create and execute workflow
-        create_result = await n8n_api.create_workflow(recovery_workflow)
-        execution_result = await n8n_api.execute_workflow(create_result["id"])
-
-        # Verify error recovery integration
-        assert execution_result["status"] in ["success", "error"]
-        # In real implementation, would verify error recovery across agents
-
-    @pytest.mark.asyncio
-    async def test_data_persistence_integration(self, integration_setup):
-        """Test data persistence across workflow execution."""
-        n8n_api = integration_setup["n8n_api"]
-        redis = integration_setup["redis"]
-
-        # Setup workflow that saves data
-        persistence_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "generate-data", "type": "n8n-nodes-base.set", "position": [300, 100],
-                 "parameters": {"values": {"string": [{"name": "data", "value": "test-data-123"}]}}},
-                {"id": "save-to-redis", "type": "n8n-nodes-base.redis", "position": [500, 100],
-                 "parameters": {"command": "set", "key": "workflow-output", "value": "={{ $json.data }}"}}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "generate-data"},
-                {"source": "generate-data", "target": "save-to-redis"}
-            ]
-        }
-
-        # Create and execute workflow
-        create_result = await n8n_api.create_workflow(persistence_workflow)
-        execution_result = await n8n_api.execute_workflow(create_result["id"])
-
-        # Verify data persistence
-        assert execution_result["status"] == "success"
-
-        # Check if data was persisted (in real implementation)
-        # persisted_data = await redis.get("workflow-output")
-        # assert persisted_data == "test-data-123"
-
-    @pytest.mark.asyncio
-    async def test_real_time_collaboration_integration(self, integration_setup):
+    async def test_real_time_collaboration_integration(self, n8n_api, websocket):
         """Test real-time collaboration during workflow execution."""
-        n8n_api = integration_setup["n8n_api"]
-        websocket = integration_setup["websocket"]
 
         # Setup collaborative workflow
-        collab_workflow = {
-            "nodes": [
-                {"id": "shared-trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "shared-action", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]}
-            ],
-            "connections": [
-                {"source": "shared-trigger", "target": "shared-action"}
-            ]
-        }
+        collab_workflow = COLLAB_WORKFLOW
 
         # Create workflow
         create_result = await n8n_api.create_workflow(collab_workflow)
         workflow_id = create_result["id"]
 
         # Simulate collaborative edits
-        websocket.queue_message({
-            "type": "node_update",
-            "userId": "user-1",
-            "nodeId": "shared-action",
-            "updates": {"parameters": {"url": "https://api1.example.com"}}
-        })
-
-        websocket.queue_message({
-            "type": "node_update",
-            "userId": "user-2",
-            "nodeId": "shared-action",
-            "updates": {"parameters": {"method": "POST"}}
-        })
+        websocket.queue_message(WsEvent(
+            type="node_update",
+            user_id="user-1",
+            node_id="shared-action",
+            updates={"parameters": {"url": "https://api1.example.com"}}
+        ))
+
+        websocket.queue_message(WsEvent(
+            type="node_update",
+            user_id="user-2",
+            node_id="shared-action",
+            updates={"parameters": {"method": "POST"}}
+        ))
 
         # Execute workflow
         execution_result = await n8n_api.execute_workflow(workflow_id)
@@ -444,106 +501,39 @@ class TestWorkflowExecutionIntegration:
         assert execution_result["status"] == "success"
         # In real implementation, would verify collaborative changes were applied
 
-    @pytest.mark.asyncio
-    async def test_workflow_versioning_integration(self, integration_setup):
+    async def test_workflow_versioning_integration(self, n8n_api):
         """Test workflow versioning across multiple executions."""
-        n8n_api = integration_setup["n8n_api"]
 
         # Initial workflow version
-        initial_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "version-1", "type": "n8n-nodes-base.set", "position": [300, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "version-1"}
-            ],
-            "version": "1.0.0"
-        }
+        initial_workflow = VERSIONED_WORKFLOW
 
         # Create initial version
         create_result = await n8n_api.create_workflow(initial_workflow)
         workflow_id = create_result["id"]
 
-        # Execute initial version
-        execution1 = await n8n_api.execute_workflow(workflow_id, {"version": "1.0.0"})
+        # Execute initial version; yield once so it starts against 1.0.0
+        # before the update, then let it finish alongside the second run
+        execution1_task = asyncio.create_task(n8n_api.execute_workflow(workflow_id, {"version": "1.0.0"}))
+        await asyncio.sleep(0)
 
         # Update workflow (new version)
-        updated_workflow = {
-            **initial_workflow,
-            "nodes": [
-                *initial_workflow["nodes"],
-                {"id": "version-2", "type": "n8n-nodes-base.set", "position": [500, 100]}
-            ],
-            "connections": [
-                *initial_workflow["connections"],
-                {"source": "version-1", "target": "version-2"}
-            ],
-            "version": "1.1.0"
-        }
-
-        await n8n_api.update_workflow(workflow_id, updated_workflow)
+        await n8n_api.update_workflow(workflow_id, UPDATED_VERSIONED_WORKFLOW)
 
         # Execute updated version
-        execution2 = await n8n_api.execute_workflow(workflow_id, {"version": "1.1.0"})
+        execution2_task = asyncio.create_task(n8n_api.execute_workflow(workflow_id, {"version": "1.1.0"}))
+
+        execution1, execution2 = await asyncio.gather(execution1_task, execution2_task)
 
         # Verify versioning integration
         assert execution1["status"] == "success"
         assert execution2["status"] == "success"
         # In real implementation, would verify version-specific execution
 
-    @pytest.mark.asyncio
-    async def test_security_integration(self, integration_setup):
-        """Test security integration across agents."""
-        n8n_api = integration_setup["n8n_api"]
-
-        # Setup workflow with security-sensitive operations
-        secure_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "secure-api", "type": "n8n-nodes-base.httpRequest", "position": [300, 100],
-                 "credentials": {"githubApi": {"id": "secure-cred"}}},
-                {"id": "data-validator", "type": "n8n-nodes-base.set", "position": [500, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "secure-api"},
-                {"source": "secure-api", "target": "data-validator"}
-            ],
-            "permissions": {
-                "required": ["api:read", "data:write"],
-                "owner": "test-user"
-            }
-        }
-
-        # Create and execute workflow
-        create_result = await n8n_api.create_workflow(secure_workflow)
-        execution_result = await n8n_api.execute_workflow(create_result["id"])
-
-        # Verify security integration
-        assert execution_result["status"] == "success"
-        # In real implementation, would verify security checks and credential validation
-
-    @pytest.mark.asyncio
-    async def test_resource_management_integration(self, integration_setup):
+    async def test_resource_management_integration(self, n8n_api):
         """Test resource management across multiple agents."""
-        n8n_api = integration_setup["n8n_api"]
-        redis = integration_setup["redis"]
 
         # Setup resource-intensive workflow
-        resource_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "batch-processor", "type": "n8n-nodes-base.splitInBatches", "position": [300, 100],
-                 "parameters": {"batchSize": 100}},
-                {"id": "data-processor", "type": "n8n-nodes-base.set", "position": [500, 100]},
-                {"id": "cache-writer", "type": "n8n-nodes-base.redis", "position": [700, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "batch-processor"},
-                {"source": "batch-processor", "target": "data-processor"},
-                {"source": "data-processor", "target": "cache-writer"}
-            ]
-        }
+        resource_workflow = RESOURCE_WORKFLOW
 
         # Create and execute workflow
         create_result = await n8n_api.create_workflow(resource_workflow)
@@ -555,28 +545,11 @@ class TestWorkflowExecutionIntegration:
         assert execution_result["status"] == "success"
         # In real implementation, would verify resource cleanup and memory management
 
-    @pytest.mark.asyncio
-    async def test_monitoring_integration(self, integration_setup):
+    async def test_monitoring_integration(self, n8n_api):
         """Test monitoring integration across all agents."""
-        n8n_api = integration_setup["n8n_api"]
 
         # Setup monitored workflow
-        monitored_workflow = {
-            "nodes": [
-                {"id": "trigger", "type": "n8n-nodes-base.manualTrigger", "position": [100, 100]},
-                {"id": "monitored-api", "type": "n8n-nodes-base.httpRequest", "position": [300, 100]},
-                {"id": "result-processor", "type": "n8n-nodes-base.set", "position": [500, 100]}
-            ],
-            "connections": [
-                {"source": "trigger", "target": "monitored-api"},
-                {"source": "monitored-api", "target": "result-processor"}
-            ],
-            "monitoring": {
-                "enabled": True,
-                "metrics": ["execution_time", "memory_usage", "api_calls"],
-                "alerts": ["error_rate", "timeout"]
-            }
-        }
+        monitored_workflow = MONITORED_WORKFLOW
 
         # Create and execute workflow
         create_result = await n8n_api.create_workflow(monitored_workflow)
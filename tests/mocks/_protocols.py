@@ -0,0 +1,31 @@
+"""
+Interfaces used as mock specs for agent collaborators.
+"""
+
+from typing import Any, Callable, Dict, Protocol
+
+
+class StateManagerProtocol(Protocol):
+    """Shared state store used by the agents."""
+
+    async def get_state(self, key: str) -> Dict[str, Any]:
+        ...
+
+    async def set_state(self, key: str, value: Any) -> bool:
+        ...
+
+    async def update_state(self, key: str, updates: Dict[str, Any]) -> bool:
+        ...
+
+
+class EventBusProtocol(Protocol):
+    """Inter-agent event bus (publish/subscribe and request/response)."""
+
+    async def publish(self, event: str, payload: Any = None) -> bool:
+        ...
+
+    async def request(self, target: str, payload: Any = None) -> Dict[str, Any]:
+        ...
+
+    async def subscribe(self, event: str, handler: Callable[..., Any]) -> bool:
+        ...
@@ -0,0 +1,98 @@
+"""
+Per-(method, endpoint) index over the requests recorded by the HTTP mocks,
+plus the other helpers the mocks share.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+_Key = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass(slots=True)
+class RequestRecord:
+    """One request recorded by an HTTP mock.
+
+    Fields can also be read dict-style (record["method"]), as with the plain
+    dicts the mocks used to record.
+    """
+
+    method: str
+    endpoint: str
+    data: Any
+    timestamp: float
+    headers: Optional[Dict[str, str]] = None
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    """Stands in for a mock's recording method when history is turned off.
+
+    Mocks created with record_history=False bind this in place of
+    _record_request/_record_operation, so throughput tests that never inspect
+    the history skip recording it.
+    """
+
+
+def _keys(request: RequestRecord) -> Tuple[_Key, ...]:
+    """Every filter key a request is counted under."""
+    method = request.method
+    endpoint = request.endpoint
+    return ((method, endpoint), (method, None), (None, endpoint), (None, None))
+
+
+class RequestIndex:
+    """Request counts and latest request for every method/endpoint filter.
+
+    Each recorded request is counted under (method, endpoint), (method, None),
+    (None, endpoint) and (None, None), so a lookup with either filter left
+    out is a single dict access instead of a scan over the history. Mocks with
+    a bounded history discard() each request the history drops, so the index
+    only ever covers the retained requests.
+    """
+
+    __slots__ = ("counts", "last")
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.last: Dict[_Key, RequestRecord] = {}
+
+    def add(self, request: RequestRecord) -> None:
+        """Index a newly recorded request."""
+        counts = self.counts
+        last = self.last
+        for key in _keys(request):
+            counts[key] += 1
+            last[key] = request
+
+    def discard(self, request: RequestRecord) -> None:
+        """Drop the oldest indexed request, e.g. once a bounded history evicts it."""
+        counts = self.counts
+        last = self.last
+        for key in _keys(request):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+            # The oldest request is only a key's latest match when it is its only match
+            if last.get(key) is request:
+                del last[key]
+
+    def count(self, method: str = None, endpoint: str = None) -> int:
+        """Number of requests matching the (optional) method and endpoint."""
+        return self.counts[(method or None, endpoint or None)]
+
+    def get_last(self, method: str = None, endpoint: str = None) -> Optional[RequestRecord]:
+        """Most recent request matching the (optional) method and endpoint."""
+        return self.last.get((method or None, endpoint or None))
+
+    def clear(self) -> None:
+        """Forget every indexed request."""
+        self.counts.clear()
+        self.last.clear()
@@ -4,26 +4,44 @@ Mock implementation of external services for testing purposes.
 
 import asyncio
 import json
-from typing import Dict, Any, List, Optional
+from collections import defaultdict, deque
+from time import monotonic as _now
+from typing import DefaultDict, Deque, Dict, Any, List, Optional, Tuple
 from unittest.mock import Mock
 
+from tests.mocks._request_index import RequestIndex, RequestRecord, _noop
+
 
 class ExternalServiceMock:
     """Mock external service for testing."""
 
-    def __init__(self, service_name: str):
+    def __init__(self, service_name: str, history_size: Optional[int] = None,
+                 record_history: bool = True):
         self.service_name = service_name
+        # Total number of requests made, whether or not they are recorded
         self.request_count = 0
-        self.requests: List[Dict[str, Any]] = []
+        # Recorded requests; only the last history_size are kept when it is set
+        self.requests: Deque[RequestRecord] = deque(maxlen=history_size)
+        self._request_index = RequestIndex()
+        if not record_history:
+            # get_request_count/get_last_request then see no requests
+            self._record_request = _noop
         self.responses: Dict[str, Dict[str, Any]] = {}
         self.error_simulation: Optional[Exception] = None
-        self.rate_limit = {"requests": 0, "window_start": 0, "limit": 100, "window_seconds": 60}
+        self.rate_limit = self._token_bucket(100, 60)
 
     def configure_response(self, endpoint: str, response: Any,
                           delay: float = 0, status_code: int = 200) -> None:
         """Configure mock response for specific endpoint."""
+        # Build the response body once here; make_request hands out copies
+        if isinstance(response, dict):
+            prepared = {**response, "status_code": status_code}
+        else:
+            prepared = {"data": response, "status_code": status_code}
+
         self.responses[endpoint] = {
             "response": response,
+            "prepared": prepared,
             "delay": delay,
             "status_code": status_code
         }
@@ -35,21 +53,22 @@ class ExternalServiceMock:
             "delay": delay
         }
 
+    def _record_request(self, method: str, endpoint: str,
+                        headers: Optional[Dict[str, str]], data: Any) -> None:
+        """Record a request in the history and its index."""
+        request_info = RequestRecord(method, endpoint, data, _now(), headers or {})
+        requests = self.requests
+        if len(requests) == requests.maxlen:
+            self._request_index.discard(requests[0])
+        requests.append(request_info)
+        self._request_index.add(request_info)
+
     async def make_request(self, method: str, endpoint: str,
                           headers: Dict[str, str] = None,
                           data: Any = None, timeout: float = 30.0) -> Dict[str, Any]:
         """Mock HTTP request to external service."""
         self.request_count += 1
-
-        # Record the request
-        request_info = {
-            "method": method,
-            "endpoint": endpoint,
-            "headers": headers or {},
-            "data": data,
-            "timestamp": asyncio.get_event_loop().time()
-        }
-        self.requests.append(request_info)
+        self._record_request(method, endpoint, headers, data)
 
         # Check rate limiting
         if not self._check_rate_limit():
@@ -59,61 +78,53 @@ class ExternalServiceMock:
                 "retry_after": 60
             }
 
-        # Check for configured error
-        if endpoint in self.responses and "error" in self.responses[endpoint]:
-            config = self.responses[endpoint]
+        config = self.responses.get(endpoint)
+        if config is not None:
             if config["delay"]:
                 await asyncio.sleep(config["delay"])
-            raise config["error"]
 
-        # Return configured response or default success
-        if endpoint in self.responses and "response" in self.responses[endpoint]:
-            config = self.responses[endpoint]
-            if config["delay"]:
-                await asyncio.sleep(config["delay"])
+            # Raise the configured error, or return the configured response
+            if "error" in config:
+                raise config["error"]
+            return config["prepared"].copy()
 
-            response_data = config["response"]
-            if isinstance(response_data, dict):
-                return {
-                    **response_data,
-                    "status_code": config.get("status_code", 200)
-                }
-            else:
-                return {
-                    "data": response_data,
-                    "status_code": config.get("status_code", 200)
-                }
-        else:
-            # Default success response
-            return {
-                "data": {"success": True, "message": "Mock response"},
-                "status_code": 200
-            }
-
-    def _check_rate_limit(self) -> bool:
-        """Check if rate limit is exceeded."""
-        current_time = asyncio.get_event_loop().time()
+        # Default success response
+        return {
+            "data": {"success": True, "message": "Mock response"},
+            "status_code": 200
+        }
 
-        # Reset window if needed
-        if current_time - self.rate_limit["window_start"] > self.rate_limit["window_seconds"]:
-            self.rate_limit["requests"] = 0
-            self.rate_limit["window_start"] = current_time
+    @staticmethod
+    def _token_bucket(requests_per_window: int, window_seconds: int) -> Dict[str, float]:
+        """Full token bucket allowing requests_per_window requests per window."""
+        return {
+            "tokens": float(requests_per_window),
+            "last_refill": _now(),
+            "rate": requests_per_window / window_seconds,
+            "capacity": requests_per_window
+        }
 
-        # Check limit
-        if self.rate_limit["requests"] >= self.rate_limit["limit"]:
+    def _check_rate_limit(self) -> bool:
+        """Take a token from the rate-limit bucket; False if it is empty."""
+        current_time = _now()
+        rate_limit = self.rate_limit
+
+        # Refill for the time elapsed since the last request, up to capacity
+        rate_limit["tokens"] = min(
+            rate_limit["capacity"],
+            rate_limit["tokens"] + (current_time - rate_limit["last_refill"]) * rate_limit["rate"]
+        )
+        rate_limit["last_refill"] = current_time
+
+        if rate_limit["tokens"] < 1:
             return False
 
-        self.rate_limit["requests"] += 1
+        rate_limit["tokens"] -= 1
         return True
 
     def set_rate_limit(self, requests_per_window: int, window_seconds: int = 60) -> None:
         """Set rate limiting parameters."""
-        self.rate_limit = {
-            "requests": 0,
-            "window_start": asyncio.get_event_loop().time(),
-            "limit": requests_per_window,
-            "window_seconds": window_seconds
-        }
+        self.rate_limit = self._token_bucket(requests_per_window, window_seconds)
 
     def set_error_simulation(self, error: Exception) -> None:
         """Set error to simulate on all requests."""
@@ -124,43 +135,34 @@ class ExternalServiceMock:
         self.error_simulation = None
 
     def get_request_count(self, method: str = None, endpoint: str = None) -> int:
-        """Get count of requests matching criteria."""
-        count = 0
-        for request in self.requests:
-            if method and request["method"] != method:
-                continue
-            if endpoint and request["endpoint"] != endpoint:
-                continue
-            count += 1
-        return count
-
-    def get_last_request(self, method: str = None, endpoint: str = None) -> Optional[Dict[str, Any]]:
-        """Get the last request matching criteria."""
-        for request in reversed(self.requests):
-            if method and request["method"] != method:
-                continue
-            if endpoint and request["endpoint"] != endpoint:
-                continue
-            return request
-        return None
+        """Get count of requests still in requests matching criteria."""
+        return self._request_index.count(method, endpoint)
+
+    def get_last_request(self, method: str = None, endpoint: str = None) -> Optional[RequestRecord]:
+        """Get the last request still in requests matching criteria."""
+        return self._request_index.get_last(method, endpoint)
 
     def clear_history(self) -> None:
         """Clear request history."""
         self.requests.clear()
+        self._request_index.clear()
         self.request_count = 0
 
-        # Reset rate limit
-        self.rate_limit["requests"] = 0
-        self.rate_limit["window_start"] = asyncio.get_event_loop().time()
+        # Refill the rate-limit bucket
+        self.rate_limit["tokens"] = float(self.rate_limit["capacity"])
+        self.rate_limit["last_refill"] = _now()
 
 
 class OAuth2ServiceMock(ExternalServiceMock):
     """Mock OAuth2 service for testing."""
 
-    def __init__(self, service_name: str):
-        super().__init__(service_name)
+    def __init__(self, service_name: str, history_size: Optional[int] = None,
+                 record_history: bool = True):
+        super().__init__(service_name, history_size, record_history)
         self.tokens: Dict[str, Dict[str, Any]] = {}
         self.authorization_codes: Dict[str, Dict[str, Any]] = {}
+        # refresh token -> access token it currently belongs to
+        self._refresh_index: Dict[str, str] = {}
 
     async def authorize(self, client_id: str, redirect_uri: str,
                        scope: str = "read") -> str:
@@ -170,7 +172,7 @@ class OAuth2ServiceMock(ExternalServiceMock):
             "client_id": client_id,
             "redirect_uri": redirect_uri,
             "scope": scope,
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": _now()
         }
 
         return auth_code
@@ -194,8 +196,9 @@ class OAuth2ServiceMock(ExternalServiceMock):
             "client_id": client_id,
             "scope": auth_info["scope"],
             "expires_in": 3600,
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": _now()
         }
+        self._refresh_index[refresh_token] = access_token
 
         return {
             "access_token": access_token,
@@ -207,24 +210,23 @@ class OAuth2ServiceMock(ExternalServiceMock):
 
     async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """Mock token refresh."""
-        # Find token by refresh token
-        for access_token, token_info in self.tokens.items():
-            if token_info["refresh_token"] == refresh_token:
-                # Generate new access token
-                new_access_token = f"access_token_{len(self.tokens) + 1}"
-                self.tokens[new_access_token] = {
-                    **token_info,
-                    "created_at": asyncio.get_event_loop().time()
-                }
-                del self.tokens[access_token]
-
-                return {
-                    "access_token": new_access_token,
-                    "token_type": "Bearer",
-                    "expires_in": 3600
-                }
-
-        return {"error": "invalid_grant"}
+        access_token = self._refresh_index.get(refresh_token)
+        if access_token is None:
+            return {"error": "invalid_grant"}
+
+        # Generate new access token; the refresh token carries over to it
+        new_access_token = f"access_token_{len(self.tokens) + 1}"
+        self.tokens[new_access_token] = {
+            **self.tokens.pop(access_token),
+            "created_at": _now()
+        }
+        self._refresh_index[refresh_token] = new_access_token
+
+        return {
+            "access_token": new_access_token,
+            "token_type": "Bearer",
+            "expires_in": 3600
+        }
 
     async def validate_token(self, access_token: str) -> Dict[str, Any]:
         """Mock token validation."""
@@ -234,7 +236,7 @@ class OAuth2ServiceMock(ExternalServiceMock):
         token_info = self.tokens[access_token]
 
         # Check if token is expired (simplified)
-        if asyncio.get_event_loop().time() - token_info["created_at"] > token_info.get("expires_in", 3600):
+        if _now() - token_info["created_at"] > token_info.get("expires_in", 3600):
             return {"error": "token_expired"}
 
         return {
@@ -247,10 +249,16 @@ class OAuth2ServiceMock(ExternalServiceMock):
 class WebhookServiceMock:
     """Mock webhook service for testing."""
 
-    def __init__(self):
+    def __init__(self, delivery_delay: float = 0.0):
         self.registered_webhooks: Dict[str, Dict[str, Any]] = {}
         self.received_webhooks: List[Dict[str, Any]] = []
+        # received_webhooks indexed by webhook id, by event and by both
+        self._received_by_id: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._received_by_event: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._received_by_pair: DefaultDict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
         self.responses: Dict[str, Any] = {}
+        # Seconds trigger_webhook takes to deliver; 0 only yields to the loop
+        self.delivery_delay = delivery_delay
 
     async def register_webhook(self, webhook_url: str, events: List[str],
                              secret: str = None) -> str:
@@ -262,7 +270,7 @@ class WebhookServiceMock:
             "url": webhook_url,
             "events": events,
             "secret": secret,
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": _now()
         }
 
         return webhook_id
@@ -280,28 +288,35 @@ class WebhookServiceMock:
             "webhook_id": webhook_id,
             "event": event,
             "payload": payload,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": _now()
         }
 
         self.received_webhooks.append(webhook_call)
+        self._received_by_id[webhook_id].append(webhook_call)
+        self._received_by_event[event].append(webhook_call)
+        self._received_by_pair[(webhook_id, event)].append(webhook_call)
 
         # Simulate webhook delivery
-        await asyncio.sleep(0.01)
+        await asyncio.sleep(self.delivery_delay)
 
         return True
 
     def get_received_webhooks(self, webhook_id: str = None, event: str = None) -> List[Dict[str, Any]]:
         """Get received webhooks matching criteria."""
-        webhooks = self.received_webhooks
-
-        if webhook_id:
-            webhooks = [w for w in webhooks if w["webhook_id"] == webhook_id]
-
-        if event:
-            webhooks = [w for w in webhooks if w["event"] == event]
+        if webhook_id and event:
+            webhooks = self._received_by_pair.get((webhook_id, event))
+        elif webhook_id:
+            webhooks = self._received_by_id.get(webhook_id)
+        elif event:
+            webhooks = self._received_by_event.get(event)
+        else:
+            return self.received_webhooks
 
-        return webhooks
+        return list(webhooks) if webhooks else []
 
     def clear_received_webhooks(self) -> None:
         """Clear received webhooks."""
         self.received_webhooks.clear()
+        self._received_by_id.clear()
+        self._received_by_event.clear()
+        self._received_by_pair.clear()
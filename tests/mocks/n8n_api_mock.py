@@ -3,40 +3,68 @@ Mock implementation of n8n API for testing purposes.
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+from collections import Counter, deque
+from time import monotonic as _now
+from typing import Deque, Dict, Any, List, Mapping, Optional, Tuple
 from unittest.mock import Mock
 
+from tests.mocks._request_index import RequestIndex, RequestRecord, _noop
+
+
+# createdAt/updatedAt reported for every stored workflow
+_TIMESTAMP = "2024-01-01T00:00:00Z"
+
 
 class N8nApiMock:
     """Mock n8n API client for testing."""
 
-    def __init__(self):
-        self.workflows: Dict[str, Any] = {}
+    def __init__(self, history_size: Optional[int] = None, simulated_exec_delay: float = 0.0,
+                 record_history: bool = True):
+        # workflow id -> (workflow data as given, {"id", "createdAt", "updatedAt"});
+        # the two are only merged when a workflow is read back
+        self.workflows: Dict[str, Tuple[Mapping[str, Any], Dict[str, str]]] = {}
         self.executions: Dict[str, Any] = {}
         self.credentials: Dict[str, Any] = {}
         self.webhooks: List[Dict[str, Any]] = []
-        self.request_history: List[Dict[str, Any]] = []
+        # Recorded requests; only the last history_size are kept when it is set
+        self.request_history: Deque[RequestRecord] = deque(maxlen=history_size)
+        self._request_index = RequestIndex()
+        # Seconds execute_workflow takes to complete; 0 only yields to the loop
+        self.simulated_exec_delay = simulated_exec_delay
+        # get_workflow_list results by filters; cleared whenever a workflow changes
+        self._workflow_list_cache: Dict[Any, List[Dict[str, Any]]] = {}
+        if not record_history:
+            # The get_request_count(s)/get_last_request helpers then report nothing
+            self._record_request = _noop
 
     def _record_request(self, method: str, endpoint: str, data: Any = None):
         """Record API request for testing."""
-        self.request_history.append({
-            "method": method,
-            "endpoint": endpoint,
-            "data": data,
-            "timestamp": asyncio.get_event_loop().time()
-        })
+        request = RequestRecord(method, endpoint, data, _now())
+        history = self.request_history
+        if len(history) == history.maxlen:
+            self._request_index.discard(history[0])
+        history.append(request)
+        self._request_index.add(request)
 
     async def create_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
         """Mock workflow creation."""
+        return self._create_workflow(workflow_data)
+
+    async def create_workflows_bulk(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Mock creating several workflows in one call; results follow payload order."""
+        create = self._create_workflow
+        return [create(workflow_data) for workflow_data in payloads]
+
+    def _create_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new workflow, recording it as a POST /workflows request."""
         self._record_request("POST", "/workflows", workflow_data)
 
         workflow_id = f"workflow-{len(self.workflows) + 1}"
-        self.workflows[workflow_id] = {
-            **workflow_data,
-            "id": workflow_id,
-            "createdAt": "2024-01-01T00:00:00Z",
-            "updatedAt": "2024-01-01T00:00:00Z"
-        }
+        self.workflows[workflow_id] = (
+            workflow_data,
+            {"id": workflow_id, "createdAt": _TIMESTAMP, "updatedAt": _TIMESTAMP}
+        )
+        self._workflows_changed()
 
         return {
             "id": workflow_id,
@@ -47,7 +75,13 @@ class N8nApiMock:
     async def get_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """Mock workflow retrieval."""
         self._record_request("GET", f"/workflows/{workflow_id}")
-        return self.workflows.get(workflow_id)
+
+        stored = self.workflows.get(workflow_id)
+        if stored is None:
+            return None
+
+        workflow_data, metadata = stored
+        return {**workflow_data, **metadata}
 
     async def update_workflow(self, workflow_id: str, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
         """Mock workflow update."""
@@ -56,11 +90,12 @@ class N8nApiMock:
         if workflow_id not in self.workflows:
             raise Exception(f"Workflow {workflow_id} not found")
 
-        self.workflows[workflow_id] = {
-            **self.workflows[workflow_id],
-            **workflow_data,
-            "updatedAt": "2024-01-01T00:00:00Z"
-        }
+        stored_data, metadata = self.workflows[workflow_id]
+        self.workflows[workflow_id] = (
+            {**stored_data, **workflow_data},
+            {**metadata, "updatedAt": _TIMESTAMP}
+        )
+        self._workflows_changed()
 
         return {
             "id": workflow_id,
@@ -74,6 +109,7 @@ class N8nApiMock:
 
         if workflow_id in self.workflows:
             del self.workflows[workflow_id]
+            self._workflows_changed()
             return {"success": True, "message": "Workflow deleted successfully"}
         else:
             raise Exception(f"Workflow {workflow_id} not found")
@@ -95,7 +131,7 @@ class N8nApiMock:
         }
 
         # Simulate execution completion
-        await asyncio.sleep(0.1)
+        await asyncio.sleep(self.simulated_exec_delay)
 
         self.executions[execution_id].update({
             "status": "success",
@@ -173,10 +209,37 @@ class N8nApiMock:
 
         return webhook_info
 
+    def _workflows_changed(self) -> None:
+        """Invalidate cached workflow lists after a create/update/delete."""
+        self._workflow_list_cache.clear()
+
     async def get_workflow_list(self, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Mock workflow listing."""
+        """Mock workflow listing; only workflows whose fields equal every filter are returned."""
         self._record_request("GET", "/workflows", filters)
-        return list(self.workflows.values())
+
+        try:
+            cache_key = frozenset(filters.items()) if filters else frozenset()
+            cached = self._workflow_list_cache.get(cache_key)
+        except TypeError:
+            # Unhashable filter values; filter without caching
+            cache_key = cached = None
+        if cached is not None:
+            # Fresh dicts per call, so a caller editing a result cannot alter the cache
+            return [dict(workflow) for workflow in cached]
+
+        workflows = [
+            {**workflow_data, **metadata}
+            for workflow_data, metadata in self.workflows.values()
+        ]
+        if filters:
+            workflows = [
+                workflow for workflow in workflows
+                if all(workflow.get(field) == value for field, value in filters.items())
+            ]
+
+        if cache_key is not None:
+            self._workflow_list_cache[cache_key] = workflows
+        return [dict(workflow) for workflow in workflows]
 
     async def get_health_status(self) -> Dict[str, Any]:
         """Mock health check."""
@@ -192,24 +255,29 @@ class N8nApiMock:
     def clear_history(self):
         """Clear request history for clean test state."""
         self.request_history.clear()
+        self._request_index.clear()
+
+    def reset(self):
+        """Drop all stored workflows, executions, credentials, webhooks and history."""
+        self.workflows.clear()
+        self._workflows_changed()
+        self.executions.clear()
+        self.credentials.clear()
+        self.webhooks.clear()
+        self.request_history.clear()
+        self._request_index.clear()
 
     def get_request_count(self, method: str = None, endpoint: str = None) -> int:
-        """Get count of requests matching criteria."""
-        count = 0
-        for request in self.request_history:
-            if method and request["method"] != method:
-                continue
-            if endpoint and request["endpoint"] != endpoint:
-                continue
-            count += 1
-        return count
-
-    def get_last_request(self, method: str = None, endpoint: str = None) -> Optional[Dict[str, Any]]:
-        """Get the last request matching criteria."""
-        for request in reversed(self.request_history):
-            if method and request["method"] != method:
-                continue
-            if endpoint and request["endpoint"] != endpoint:
-                continue
-            return request
-        return None
+        """Get count of requests still in request_history matching criteria."""
+        return self._request_index.count(method, endpoint)
+
+    def get_request_counts(self) -> Counter:
+        """Count requests by exact (method, endpoint), read from the request index."""
+        return Counter({
+            key: count for key, count in self._request_index.counts.items()
+            if key[0] is not None and key[1] is not None
+        })
+
+    def get_last_request(self, method: str = None, endpoint: str = None) -> Optional[RequestRecord]:
+        """Get the last request still in request_history matching criteria."""
+        return self._request_index.get_last(method, endpoint)
@@ -3,22 +3,79 @@ Mock implementation of Redis client for testing purposes.
 """
 
 import asyncio
+import fnmatch
+import heapq
+import re
 import time
 import json
-from typing import Dict, Any, Optional, List, Union
+from collections import deque
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Deque, Dict, Any, Iterator, Optional, List, Tuple, Union
 from unittest.mock import Mock
 
+from tests.mocks._request_index import _noop
+
+
+# Type codes stored in each RedisMock record; values of any other type are
+# returned JSON-encoded by GET
+_STRING, _NUMBER, _HASH, _LIST, _OTHER = range(5)
+
+# A list stored by SET can be extended by LPUSH, as with keys LPUSH created. A
+# dict stored by SET stays _OTHER: only HSET creates hashes, so HSET/HGET on it
+# still treat it as not a hash.
+_TYPE_CODES = {str: _STRING, bytes: _STRING, int: _NUMBER, float: _NUMBER, list: _LIST}
+
+# How GET renders a stored value, indexed by its type code
+_GET_CONVERTERS = (
+    lambda value: value,  # _STRING
+    str,                  # _NUMBER
+    json.dumps,           # _HASH
+    json.dumps,           # _LIST
+    json.dumps,           # _OTHER
+)
+
+# Record layout: (value, type code, expire_at or None)
+_Record = Tuple[Any, int, Optional[float]]
+
+
+class _StrHashView(Mapping):
+    """Read-only view of a hash that returns its values as strings on access."""
+
+    __slots__ = ("_fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        self._fields = fields
+
+    def __getitem__(self, field: str) -> str:
+        return str(self._fields[field])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
 
 class RedisMock:
     """Mock Redis client for testing."""
 
-    def __init__(self):
-        self.data: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, history_size: Optional[int] = None, record_history: bool = True):
+        self.data: Dict[str, _Record] = {}
         self.pubsub_channels: Dict[str, List] = {}
-        self.expiration_times: Dict[str, float] = {}
-        self.operation_history: List[Dict[str, Any]] = []
-
-    def _record_operation(self, operation: str, key: str, value: Any = None):
+        # (expire_at, key) min-heap; entries whose expire_at no longer matches
+        # the key's record are skipped
+        self._expiration_heap: List[Tuple[float, str]] = []
+        # Recorded operations; only the last history_size are kept when it is set
+        self.operation_history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        if not record_history:
+            # get_operation_count is then always 0
+            self._record_operation = _noop
+
+    def _record_operation(self, operation: str, key: Union[str, Tuple[str, ...]], value: Any = None):
         """Record Redis operation for testing."""
         self.operation_history.append({
             "operation": operation,
@@ -27,31 +84,40 @@ class RedisMock:
             "timestamp": time.time()
         })
 
+    def _sweep_expired(self, now: float) -> None:
+        """Drop every key whose expiration time has passed."""
+        heap = self._expiration_heap
+        data = self.data
+        while heap and heap[0][0] <= now:
+            expiration, key = heapq.heappop(heap)
+            record = data.get(key)
+            if record is not None and record[2] == expiration:
+                del data[key]
+
     async def set(self, key: str, value: Union[str, bytes, int, float], ex: int = None,
                   px: int = None, nx: bool = False, xx: bool = False) -> bool:
         """Mock Redis SET operation."""
         self._record_operation("SET", key, value)
 
         # Check NX (only set if key doesn't exist) and XX (only set if key exists)
-        if nx and key in self.data:
+        existing = self.data.get(key)
+        if nx and existing is not None:
             return False
-        if xx and key not in self.data:
+        if xx and existing is None:
             return False
 
-        # Set expiration time
-        expiration = None
+        # Set expiration time, otherwise keep the key's current one
         if ex:
             expiration = time.time() + ex
         elif px:
             expiration = time.time() + (px / 1000)
+        else:
+            expiration = existing[2] if existing is not None else None
 
-        if expiration:
-            self.expiration_times[key] = expiration
+        if expiration and (existing is None or existing[2] != expiration):
+            heapq.heappush(self._expiration_heap, (expiration, key))
 
-        self.data[key] = {
-            "value": value,
-            "type": type(value).__name__
-        }
+        self.data[key] = (value, _TYPE_CODES.get(type(value), _OTHER), expiration)
 
         return True
 
@@ -59,55 +125,45 @@ class RedisMock:
         """Mock Redis GET operation."""
         self._record_operation("GET", key)
 
-        # Check if key exists and hasn't expired
-        if key not in self.data:
+        # Expired keys are swept first, so any key still present is live
+        self._sweep_expired(time.time())
+        record = self.data.get(key)
+        if record is None:
             return None
 
-        if key in self.expiration_times:
-            if time.time() > self.expiration_times[key]:
-                await self.delete(key)
-                return None
-
-        data = self.data[key]
-        if data["type"] == "str":
-            return data["value"]
-        elif data["type"] in ["int", "float"]:
-            return str(data["value"])
-        else:
-            return json.dumps(data["value"])
+        return _GET_CONVERTERS[record[1]](record[0])
 
     async def delete(self, *keys: str) -> int:
         """Mock Redis DEL operation."""
+        # One history entry per command, holding every key it was given
+        self._record_operation("DEL", keys)
+
+        data = self.data
         deleted_count = 0
         for key in keys:
-            self._record_operation("DEL", key)
-            if key in self.data:
-                del self.data[key]
+            if key in data:
+                del data[key]
                 deleted_count += 1
-            if key in self.expiration_times:
-                del self.expiration_times[key]
 
         return deleted_count
 
     async def exists(self, *keys: str) -> int:
         """Mock Redis EXISTS operation."""
-        count = 0
-        for key in keys:
-            self._record_operation("EXISTS", key)
-            if key in self.data:
-                if key in self.expiration_times:
-                    if time.time() <= self.expiration_times[key]:
-                        count += 1
-                else:
-                    count += 1
-        return count
+        self._record_operation("EXISTS", keys)
+        self._sweep_expired(time.time())
+
+        data = self.data
+        return sum(1 for key in keys if key in data)
 
     async def expire(self, key: str, seconds: int) -> bool:
         """Mock Redis EXPIRE operation."""
         self._record_operation("EXPIRE", key, seconds)
 
-        if key in self.data:
-            self.expiration_times[key] = time.time() + seconds
+        record = self.data.get(key)
+        if record is not None:
+            expiration = time.time() + seconds
+            self.data[key] = (record[0], record[1], expiration)
+            heapq.heappush(self._expiration_heap, (expiration, key))
             return True
         return False
 
@@ -115,69 +171,94 @@ class RedisMock:
         """Mock Redis TTL operation."""
         self._record_operation("TTL", key)
 
-        if key not in self.expiration_times:
+        record = self.data.get(key)
+        if record is None or record[2] is None:
             return -1
 
-        remaining = self.expiration_times[key] - time.time()
+        remaining = record[2] - time.time()
         return max(-1, int(remaining))
 
     async def keys(self, pattern: str = "*") -> List[str]:
         """Mock Redis KEYS operation."""
         self._record_operation("KEYS", pattern)
 
-        import fnmatch
-        matching_keys = []
-        for key in self.data.keys():
-            if fnmatch.fnmatch(key, pattern):
-                # Check if key hasn't expired
-                if key not in self.expiration_times or time.time() <= self.expiration_times[key]:
-                    matching_keys.append(key)
+        self._sweep_expired(time.time())
+
+        # Translate the glob once rather than per key, and skip matching for "*"
+        if pattern == "*":
+            return list(self.data)
 
-        return matching_keys
+        match = re.compile(fnmatch.translate(pattern)).match
+        return [key for key in self.data if match(key)]
 
-    async def hset(self, key: str, field: str, value: Union[str, int, float]) -> int:
-        """Mock Redis HSET operation."""
-        self._record_operation("HSET", f"{key}:{field}", value)
+    async def hset(self, key: str, *field_values: Union[str, int, float],
+                   mapping: Dict[str, Union[str, int, float]] = None) -> int:
+        """Mock Redis HSET operation.
 
-        if key not in self.data:
-            self.data[key] = {"value": {}, "type": "hash"}
+        Accepts HSET's variadic form, hset(key, field1, value1, field2, value2, ...),
+        and/or a mapping of fields to values. Returns the number of new fields.
+        """
+        if len(field_values) % 2:
+            raise Exception("HSET requires field/value pairs")
 
-        if self.data[key]["type"] != "hash":
+        updates = dict(zip(field_values[::2], field_values[1::2]))
+        if mapping:
+            updates.update(mapping)
+        if not updates:
+            raise Exception("HSET requires at least one field/value pair")
+
+        self._record_operation("HSET", key, updates)
+
+        record = self.data.get(key)
+        if record is None:
+            record = self.data[key] = ({}, _HASH, None)
+
+        if record[1] != _HASH:
             raise Exception("Key is not a hash")
 
-        self.data[key]["value"][field] = value
-        return 1
+        fields = record[0]
+        added = sum(1 for field in updates if field not in fields)
+        fields.update(updates)
+        return added
 
     async def hget(self, key: str, field: str) -> Optional[str]:
         """Mock Redis HGET operation."""
         self._record_operation("HGET", f"{key}:{field}")
 
-        if key not in self.data or self.data[key]["type"] != "hash":
+        record = self.data.get(key)
+        if record is None or record[1] != _HASH:
             return None
 
-        return str(self.data[key]["value"].get(field, ""))
+        return str(record[0].get(field, ""))
 
-    async def hgetall(self, key: str) -> Dict[str, str]:
-        """Mock Redis HGETALL operation."""
-        self._record_operation("HGETALL", key)
+    async def hgetall(self, key: str) -> Mapping[str, str]:
+        """Mock Redis HGETALL operation.
 
-        if key not in self.data or self.data[key]["type"] != "hash":
-            return {}
+        Returns a read-only view of the stored hash rather than a copy; values
+        that are not already strings are converted as they are read.
+        """
+        self._record_operation("HGETALL", key)
 
-        result = {}
-        for field, value in self.data[key]["value"].items():
-            result[field] = str(value)
+        record = self.data.get(key)
+        if record is None or record[1] != _HASH:
+            return MappingProxyType({})
 
-        return result
+        fields = record[0]
+        if all(isinstance(value, str) for value in fields.values()):
+            return MappingProxyType(fields)
+        return _StrHashView(fields)
 
     async def publish(self, channel: str, message: str) -> int:
         """Mock Redis PUBLISH operation."""
         self._record_operation("PUBLISH", channel, message)
 
-        # Simulate subscribers receiving the message
+        # Simulate subscribers receiving the message, encoded once for all of them
         if channel in self.pubsub_channels:
+            encoded = message.encode('utf-8')
             for subscriber in self.pubsub_channels[channel]:
-                if hasattr(subscriber, 'put_nowait'):
+                if isinstance(subscriber, PubSubMock):
+                    subscriber.put_nowait_bytes(encoded)
+                elif hasattr(subscriber, 'put_nowait'):
                     subscriber.put_nowait(message)
 
         return len(self.pubsub_channels.get(channel, []))
@@ -198,42 +279,45 @@ class RedisMock:
         """Mock Redis LPUSH operation."""
         self._record_operation("LPUSH", key, values)
 
-        if key not in self.data:
-            self.data[key] = {"value": [], "type": "list"}
+        record = self.data.get(key)
+        if record is None:
+            record = self.data[key] = ([], _LIST, None)
 
-        if self.data[key]["type"] != "list":
+        if record[1] != _LIST:
             raise Exception("Key is not a list")
 
-        self.data[key]["value"].extend(values)
-        return len(self.data[key]["value"])
+        record[0].extend(values)
+        return len(record[0])
 
     async def rpop(self, key: str) -> Optional[str]:
         """Mock Redis RPOP operation."""
         self._record_operation("RPOP", key)
 
-        if key not in self.data or self.data[key]["type"] != "list":
+        record = self.data.get(key)
+        if record is None or record[1] != _LIST:
             return None
 
-        if self.data[key]["value"]:
-            return self.data[key]["value"].pop()
+        if record[0]:
+            return record[0].pop()
 
         return None
 
     def clear_all(self):
         """Clear all data for clean test state."""
         self.data.clear()
-        self.expiration_times.clear()
+        self._expiration_heap.clear()
         self.pubsub_channels.clear()
         self.operation_history.clear()
 
     def get_operation_count(self, operation: str = None) -> int:
         """Get count of operations matching criteria."""
         if operation:
-            return len([op for op in self.operation_history if op["operation"] == operation])
+            return sum(1 for op in self.operation_history if op["operation"] == operation)
         return len(self.operation_history)
 
     def get_keys_count(self) -> int:
         """Get total number of keys."""
+        self._sweep_expired(time.time())
         return len(self.data)
 
 
@@ -242,21 +326,34 @@ class PubSubMock:
 
     def __init__(self):
         self.channels: List[str] = []
-        self.messages: asyncio.Queue = asyncio.Queue()
+        # Encoded payloads waiting to be read; _message_ready is set while the
+        # buffer is non-empty so get_message only waits on an empty one
+        self.messages: Deque[bytes] = deque()
+        self._message_ready = asyncio.Event()
 
     async def get_message(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
         """Mock get message from pubsub."""
-        try:
-            return await asyncio.wait_for(self.messages.get(), timeout=timeout)
-        except asyncio.TimeoutError:
-            return None
+        messages = self.messages
+        if not messages:
+            deadline = time.monotonic() + timeout
+            while not messages:
+                self._message_ready.clear()
+                try:
+                    await asyncio.wait_for(self._message_ready.wait(),
+                                           timeout=max(0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    return None
+
+        return {"type": "message", "data": messages.popleft()}
 
     def put_nowait(self, message: str):
         """Put message in queue."""
-        self.messages.put_nowait({
-            "type": "message",
-            "data": message.encode('utf-8')
-        })
+        self.put_nowait_bytes(message.encode('utf-8'))
+
+    def put_nowait_bytes(self, data: bytes):
+        """Put an already UTF-8 encoded message in queue."""
+        self.messages.append(data)
+        self._message_ready.set()
 
     async def close(self):
         """Mock close pubsub connection."""
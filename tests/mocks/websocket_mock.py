@@ -4,20 +4,170 @@ Mock implementation of WebSocket client for testing purposes.
 
 import asyncio
 import json
-from typing import Dict, Any, List, Optional
+from collections import deque
+from dataclasses import dataclass
+from operator import attrgetter
+from time import monotonic as _now
+from typing import Deque, Dict, Any, List, Mapping, Optional
 from unittest.mock import Mock
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+@dataclass(frozen=True, slots=True)
+class WsEvent:
+    """Fixed-shape WebSocket event that can be queued instead of a dict."""
+
+    type: str
+    user_id: Optional[str] = None
+    node_id: Optional[str] = None
+    position: Optional[Mapping[str, Any]] = None
+    updates: Optional[Mapping[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the event as a message dict using the camelCase wire keys."""
+        message: Dict[str, Any] = {"type": self.type}
+        for field, key in _WS_EVENT_KEYS:
+            value = getattr(self, field)
+            if value is not None:
+                message[key] = value
+        return message
+
+
+@dataclass(slots=True)
+class MessageRecord:
+    """One message sent or queued on a WebSocketMock.
+
+    Fields can also be read dict-style (record["message"]), as with the plain
+    dicts the mock used to record.
+    """
+
+    message: str
+    timestamp: float
+    direction: str
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+
+# (WsEvent field, message key) for the optional WsEvent fields, in wire order
+_WS_EVENT_KEYS = (
+    ("user_id", "userId"),
+    ("node_id", "nodeId"),
+    ("position", "position"),
+    ("updates", "updates"),
+)
+
+
+if orjson is not None:
+    def _encode(message: Any) -> str:
+        """Serialize a message mapping to a JSON string."""
+        return orjson.dumps(message, default=dict, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _loads = orjson.loads
+else:  # pragma: no cover - orjson is optional
+    def _encode(message: Any) -> str:
+        """Serialize a message mapping to a JSON string."""
+        # default=dict covers frozen MappingProxyType fixture data
+        return json.dumps(message, default=dict)
+
+    _loads = json.loads
+
+
+# get_message_count direction -> counter reader
+_COUNTERS = {
+    "sent": attrgetter("sent_count"),
+    "received": attrgetter("received_count"),
+}
+
+
+def _serialize(message: Any) -> str:
+    """Return the wire string for a message (a mapping, WsEvent or string)."""
+    if isinstance(message, WsEvent):
+        message = message.to_dict()
+    if isinstance(message, Mapping):
+        return _encode(message)
+    return str(message)
+
+
+def _decode(message_str: str) -> Any:
+    """Decode a queued message, leaving non-JSON payloads as strings."""
+    try:
+        return _loads(message_str)
+    except ValueError:
+        return message_str
+
 
 class WebSocketMock:
     """Mock WebSocket client for testing."""
 
-    def __init__(self, url: str = "ws://test.example.com"):
+    __slots__ = (
+        "url",
+        "_connected",
+        "messages_sent",
+        "messages_received",
+        "sent_count",
+        "received_count",
+        "connection_history",
+        "_error_simulation",
+        "_send_ready",
+        "_connect_count",
+        "_server",
+        "_message_ready",
+    )
+
+    def __init__(self, url: str = "ws://test.example.com",
+                 server: Optional["WebSocketServerMock"] = None):
         self.url = url
-        self.connected = False
-        self.messages_sent: List[Dict[str, Any]] = []
-        self.messages_received: List[Dict[str, Any]] = []
+        self._connected = False
+        # True while connected with no error simulated, so send() can skip its checks
+        self._send_ready = False
+        # Server that created this connection; it is told when connected changes
+        self._server = server
+        self.messages_sent: List[MessageRecord] = []
+        self.messages_received: Deque[MessageRecord] = deque()
+        # Number of messages sent, and still waiting in messages_received
+        self.sent_count = 0
+        self.received_count = 0
+        # Set whenever a message is queued, so receive() can wait for one
+        self._message_ready = asyncio.Event()
         self.connection_history: List[Dict[str, Any]] = []
-        self.error_simulation: Optional[Exception] = None
+        self._error_simulation: Optional[Exception] = None
+        self._connect_count = 0
+
+    @property
+    def error_simulation(self) -> Optional[Exception]:
+        """Error raised by connect/send/receive while set."""
+        return self._error_simulation
+
+    @error_simulation.setter
+    def error_simulation(self, error: Optional[Exception]) -> None:
+        self._error_simulation = error
+        self._send_ready = self.connected and not error
+
+    @property
+    def connected(self) -> bool:
+        """Whether the connection is open."""
+        return self._connected
+
+    @connected.setter
+    def connected(self, connected: bool) -> None:
+        self._set_connected(connected)
+
+    def _set_connected(self, connected: bool) -> None:
+        """Update connected, keeping _send_ready and the server's active count in step."""
+        connected = bool(connected)
+        if connected != self._connected:
+            self._connected = connected
+            self._send_ready = connected and not self._error_simulation
+            if self._server is not None:
+                self._server._active_count += 1 if connected else -1
 
     async def connect(self, url: str = None) -> bool:
         """Mock WebSocket connection."""
@@ -26,11 +176,12 @@ class WebSocketMock:
         if self.error_simulation:
             raise self.error_simulation
 
-        self.connected = True
+        self._set_connected(True)
+        self._connect_count += 1
         self.connection_history.append({
             "action": "connect",
             "url": connection_url,
-            "timestamp": asyncio.get_event_loop().time(),
+            "timestamp": _now(),
             "success": True
         })
 
@@ -38,36 +189,34 @@ class WebSocketMock:
 
     async def disconnect(self, code: int = 1000, reason: str = "") -> None:
         """Mock WebSocket disconnection."""
-        self.connected = False
+        self._set_connected(False)
         self.connection_history.append({
             "action": "disconnect",
             "code": code,
             "reason": reason,
-            "timestamp": asyncio.get_event_loop().time(),
+            "timestamp": _now(),
             "success": True
         })
 
     async def send(self, message: Any) -> bool:
         """Mock sending message through WebSocket."""
-        if not self.connected:
-            raise Exception("WebSocket is not connected")
-
-        if self.error_simulation:
-            raise self.error_simulation
-
-        # Convert message to JSON string if it's a dict
-        if isinstance(message, dict):
-            message_str = json.dumps(message)
+        if not self._send_ready:
+            if not self.connected:
+                raise Exception("WebSocket is not connected")
+
+            if self._error_simulation:
+                raise self._error_simulation
+
+        # Convert message to JSON string if it's a mapping (frozen fixtures included)
+        if type(message) is str:
+            message_str = message
+        elif isinstance(message, Mapping):
+            message_str = _encode(message)
         else:
             message_str = str(message)
 
-        sent_message = {
-            "message": message_str,
-            "timestamp": asyncio.get_event_loop().time(),
-            "direction": "sent"
-        }
-
-        self.messages_sent.append(sent_message)
+        self.messages_sent.append(MessageRecord(message_str, _now(), "sent"))
+        self.sent_count += 1
 
         return True
 
@@ -79,27 +228,42 @@ class WebSocketMock:
         if self.error_simulation:
             raise self.error_simulation
 
-        # Check if there are queued messages to receive
-        if self.messages_received:
-            received_message = self.messages_received.pop(0)
-            return received_message["message"]
-
-        # Simulate timeout
-        await asyncio.sleep(0.1)
-        return None
+        # Wait up to timeout for a message to be queued
+        messages = self.messages_received
+        if not messages:
+            deadline = _now() + timeout
+            while not messages:
+                self._message_ready.clear()
+                try:
+                    await asyncio.wait_for(self._message_ready.wait(),
+                                           timeout=max(0, deadline - _now()))
+                except asyncio.TimeoutError:
+                    return None
+
+        received_message = messages.popleft()
+        self.received_count -= 1
+        return received_message.message
 
     def queue_message(self, message: Any) -> None:
-        """Queue a message to be received."""
-        if isinstance(message, dict):
-            message_str = json.dumps(message)
-        else:
-            message_str = str(message)
-
-        self.messages_received.append({
-            "message": message_str,
-            "timestamp": asyncio.get_event_loop().time(),
-            "direction": "received"
-        })
+        """Queue a message (a dict, WsEvent or string) to be received."""
+        self._enqueue_raw(MessageRecord(_serialize(message), _now(), "received"))
+
+    def _enqueue_raw(self, record: MessageRecord) -> None:
+        """Queue an already serialized received-message record.
+
+        Records are never modified after queueing, so a broadcast can share
+        one record between all of its recipients.
+        """
+        self.messages_received.append(record)
+        self.received_count += 1
+        self._message_ready.set()
+
+    def _enqueue_raw_many(self, records: List[MessageRecord]) -> None:
+        """Queue several already serialized received-message records, in order."""
+        self.messages_received.extend(records)
+        self.received_count += len(records)
+        if records:
+            self._message_ready.set()
 
     async def ping(self, data: bytes = b"") -> bool:
         """Mock WebSocket ping."""
@@ -109,7 +273,7 @@ class WebSocketMock:
         self.connection_history.append({
             "action": "ping",
             "data": data,
-            "timestamp": asyncio.get_event_loop().time(),
+            "timestamp": _now(),
             "success": True
         })
 
@@ -123,24 +287,48 @@ class WebSocketMock:
         """Clear error simulation."""
         self.error_simulation = None
 
+    def drain(self, type_filter: str = None) -> List[Any]:
+        """Remove and return every queued message, decoded from JSON.
+
+        When type_filter is given only messages with that "type" are returned;
+        the rest are still discarded.
+        """
+        messages = [_decode(received.message) for received in self.messages_received]
+        self.messages_received.clear()
+        self.received_count = 0
+
+        if type_filter is None:
+            return messages
+        return [
+            message for message in messages
+            if isinstance(message, dict) and message.get("type") == type_filter
+        ]
+
     def get_message_count(self, direction: str = None) -> int:
         """Get count of messages sent or received."""
-        if direction == "sent":
-            return len(self.messages_sent)
-        elif direction == "received":
-            return len(self.messages_received)
-        else:
-            return len(self.messages_sent) + len(self.messages_received)
+        counter = _COUNTERS.get(direction)
+        if counter is None:
+            return self.sent_count + self.received_count
+        return counter(self)
 
     def get_connection_count(self) -> int:
         """Get number of connection attempts."""
-        return len([h for h in self.connection_history if h["action"] == "connect"])
+        return self._connect_count
 
     def clear_history(self) -> None:
         """Clear all history for clean test state."""
         self.messages_sent.clear()
         self.messages_received.clear()
+        self.sent_count = 0
+        self.received_count = 0
         self.connection_history.clear()
+        self._connect_count = 0
+
+    def reset(self) -> None:
+        """Return the connection to its freshly created state."""
+        self._set_connected(False)
+        self.error_simulation = None
+        self.clear_history()
 
 
 class WebSocketServerMock:
@@ -150,6 +338,8 @@ class WebSocketServerMock:
         self.connections: List[WebSocketMock] = []
         self.broadcast_messages: List[Dict[str, Any]] = []
         self.url = "ws://localhost:8765"
+        # Number of connections in self.connections that are connected
+        self._active_count = 0
 
     async def start_server(self, host: str = "localhost", port: int = 8765) -> None:
         """Mock starting WebSocket server."""
@@ -159,45 +349,87 @@ class WebSocketServerMock:
         """Mock stopping WebSocket server."""
         for connection in self.connections:
             await connection.disconnect()
+            connection._server = None
         self.connections.clear()
 
     async def broadcast(self, message: Any) -> int:
         """Broadcast message to all connected clients."""
-        if isinstance(message, dict):
-            message_str = json.dumps(message)
-        else:
-            message_str = str(message)
+        # Serialize once for the log and every recipient
+        message_str = _serialize(message)
+        timestamp = _now()
 
         broadcast_info = {
             "message": message_str,
-            "timestamp": asyncio.get_event_loop().time(),
+            "timestamp": timestamp,
             "recipient_count": len(self.connections)
         }
 
         self.broadcast_messages.append(broadcast_info)
 
         # Send to all connected clients
+        record = MessageRecord(message_str, timestamp, "received")
         for connection in self.connections:
-            connection.queue_message(message)
+            connection._enqueue_raw(record)
 
         return len(self.connections)
 
+    async def broadcast_many(self, messages: List[Any]) -> int:
+        """Broadcast several messages, in order, to all connected clients."""
+        connections = self.connections
+        timestamp = _now()
+        recipient_count = len(connections)
+
+        # Serialize each message once for the log and every recipient
+        message_strs = [_serialize(message) for message in messages]
+
+        self.broadcast_messages.extend(
+            {
+                "message": message_str,
+                "timestamp": timestamp,
+                "recipient_count": recipient_count
+            }
+            for message_str in message_strs
+        )
+
+        # Send to all connected clients
+        records = [
+            MessageRecord(message_str, timestamp, "received")
+            for message_str in message_strs
+        ]
+        for connection in connections:
+            connection._enqueue_raw_many(records)
+
+        return recipient_count
+
     def create_connection(self) -> WebSocketMock:
         """Create a new mock connection."""
-        connection = WebSocketMock(self.url)
+        connection = WebSocketMock(self.url, self)
         self.connections.append(connection)
         return connection
 
+    def create_connections(self, count: int) -> List[WebSocketMock]:
+        """Create several mock connections at once."""
+        url = self.url
+        connections = [WebSocketMock(url, self) for _ in range(count)]
+        self.connections.extend(connections)
+        return connections
+
     def remove_connection(self, connection: WebSocketMock) -> None:
         """Remove a connection."""
         if connection in self.connections:
             self.connections.remove(connection)
+            if connection.connected:
+                self._active_count -= 1
+            connection._server = None
 
     def get_connection_count(self) -> int:
         """Get number of active connections."""
-        return len([c for c in self.connections if c.connected])
+        return self._active_count
 
     def clear_all(self) -> None:
         """Clear all connections and history."""
+        for connection in self.connections:
+            connection._server = None
         self.connections.clear()
+        self._active_count = 0
         self.broadcast_messages.clear()
@@ -8,6 +8,21 @@ from unittest.mock import Mock, AsyncMock
 from typing import Dict, Any
 
 from agents.canvas_manager_agent import CanvasManagerAgent
+from tests.fixtures.frozen import freeze, thaw
+from tests.fixtures.ids import node_id
+
+
+# Canvas state the tests start from; the canvas_state fixture hands out copies
+CANVAS_STATE = freeze({
+    "nodes": [
+        {"id": "node-1", "type": "trigger", "position": {"x": 100, "y": 100}},
+        {"id": "node-2", "type": "action", "position": {"x": 300, "y": 100}}
+    ],
+    "edges": [
+        {"id": "edge-1-2", "source": "node-1", "target": "node-2"}
+    ],
+    "viewport": {"x": 0, "y": 0, "zoom": 1.0}
+})
 
 
 class TestCanvasManagerAgent:
@@ -24,17 +39,8 @@ class TestCanvasManagerAgent:
 
     @pytest.fixture
     def canvas_state(self):
-        """Sample canvas state."""
-        return {
-            "nodes": [
-                {"id": "node-1", "type": "trigger", "position": {"x": 100, "y": 100}},
-                {"id": "node-2", "type": "action", "position": {"x": 300, "y": 100}}
-            ],
-            "edges": [
-                {"id": "edge-1-2", "source": "node-1", "target": "node-2"}
-            ],
-            "viewport": {"x": 0, "y": 0, "zoom": 1.0}
-        }
+        """Sample canvas state (a private, mutable copy of CANVAS_STATE)."""
+        return thaw(CANVAS_STATE)
 
     @pytest.fixture
     def move_action_input(self):
@@ -79,13 +85,13 @@ class TestCanvasManagerAgent:
     async def test_node_move_action(self, agent, canvas_state, move_action_input):
         """Test node move action."""
         # Setup
-        agent.canvas_engine.move_nodes = Mock(return_value={
-            **canvas_state,
-            "nodes": [
-                {**node, "position": move_action_input["position"]} if node["id"] == "node-1" else node
-                for node in canvas_state["nodes"]
-            ]
-        })
+        expected = dict(canvas_state)
+        expected["nodes"] = [
+            {"id": node["id"], "type": node["type"], "position": move_action_input["position"]}
+            if node["id"] == "node-1" else node
+            for node in canvas_state["nodes"]
+        ]
+        agent.canvas_engine.move_nodes = Mock(return_value=expected)
         agent.storage_service.save_state = AsyncMock(return_value=True)
 
         # Execute
@@ -145,11 +151,13 @@ class TestCanvasManagerAgent:
         }
 
         # Setup
-        agent.canvas_engine.delete_nodes = Mock(return_value={
-            **canvas_state,
-            "nodes": [node for node in canvas_state["nodes"] if node["id"] != "node-1"],
-            "edges": [edge for edge in canvas_state["edges"] if "node-1" not in [edge["source"], edge["target"]]]
-        })
+        expected = dict(canvas_state)
+        expected["nodes"] = [node for node in canvas_state["nodes"] if node["id"] != "node-1"]
+        expected["edges"] = [
+            edge for edge in canvas_state["edges"]
+            if edge["source"] != "node-1" and edge["target"] != "node-1"
+        ]
+        agent.canvas_engine.delete_nodes = Mock(return_value=expected)
         agent.storage_service.save_state = AsyncMock(return_value=True)
 
         # Execute
@@ -261,13 +269,16 @@ class TestCanvasManagerAgent:
     async def test_layout_optimization(self, agent, canvas_state):
         """Test automatic layout optimization."""
         # Setup
-        agent.canvas_engine.optimize_layout = Mock(return_value={
-            **canvas_state,
-            "nodes": [
-                {**node, "position": {"x": node["position"]["x"] + 50, "y": node["position"]["y"] + 50}}
-                for node in canvas_state["nodes"]
-            ]
-        })
+        expected = dict(canvas_state)
+        expected["nodes"] = [
+            {
+                "id": node["id"],
+                "type": node["type"],
+                "position": {"x": node["position"]["x"] + 50, "y": node["position"]["y"] + 50}
+            }
+            for node in canvas_state["nodes"]
+        ]
+        agent.canvas_engine.optimize_layout = Mock(return_value=expected)
 
         # Execute layout optimization
         result = await agent.optimize_layout()
@@ -302,14 +313,13 @@ class TestCanvasManagerAgent:
         }
 
         # Setup
-        agent.canvas_engine.move_nodes = Mock(return_value={
-            **canvas_state,
-            "nodes": [
-                {**node, "position": multi_select_input["position"]}
-                if node["id"] in multi_select_input["targetNodes"] else node
-                for node in canvas_state["nodes"]
-            ]
-        })
+        expected = dict(canvas_state)
+        expected["nodes"] = [
+            {"id": node["id"], "type": node["type"], "position": multi_select_input["position"]}
+            if node["id"] in multi_select_input["targetNodes"] else node
+            for node in canvas_state["nodes"]
+        ]
+        agent.canvas_engine.move_nodes = Mock(return_value=expected)
 
         # Execute
         result = await agent.handle_canvas_action(multi_select_input)
@@ -532,9 +542,10 @@ class TestCanvasManagerAgent:
         """Test memory management during canvas operations."""
         # Setup large canvas state
         large_canvas = canvas_state.copy()
+        node_type = canvas_state["nodes"][0]["type"]
         large_canvas["nodes"] = [
-            {**node, "id": f"node-{i}", "position": {"x": i * 10, "y": i * 10}}
-            for i, node in enumerate([canvas_state["nodes"][0]] * 100)
+            {"id": node_id(i), "type": node_type, "position": {"x": i * 10, "y": i * 10}}
+            for i in range(100)
         ]
 
         agent.current_state = large_canvas
@@ -542,7 +553,7 @@ class TestCanvasManagerAgent:
         # Execute operation on large canvas
         result = await agent.handle_canvas_action({
             "action": "move",
-            "targetNodes": [f"node-{i}" for i in range(10)],
+            "targetNodes": [node_id(i) for i in range(10)],
             "position": {"x": 1000, "y": 1000}
         })
 
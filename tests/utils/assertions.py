@@ -3,6 +3,7 @@ Custom assertions for n8n Visual Workflow Builder tests.
 """
 
 import pytest
+from collections.abc import Mapping
 from typing import Dict, Any, List
 from tests.utils.test_helpers import ValidationHelpers, DataComparisonHelpers
 
@@ -56,8 +57,8 @@ class WorkflowAssertions:
     def assert_workflow_data_flow(workflow: Dict[str, Any], input_data: Dict[str, Any], expected_output: Dict[str, Any]):
         """Assert data flows correctly through workflow."""
         # This is a simplified assertion - real implementation would trace data flow
-        assert isinstance(input_data, dict), "Input data must be a dictionary"
-        assert isinstance(expected_output, dict), "Expected output must be a dictionary"
+        assert isinstance(input_data, Mapping), "Input data must be a dictionary"
+        assert isinstance(expected_output, Mapping), "Expected output must be a dictionary"
 
     @staticmethod
     def assert_no_circular_dependencies(workflow: Dict[str, Any]):
@@ -277,7 +278,7 @@ class APIAssertions:
     def assert_api_response_format(response: Dict[str, Any]):
         """Assert API response has correct format."""
         # Standard n8n API response format
-        assert isinstance(response, dict), "Response must be a dictionary"
+        assert isinstance(response, Mapping), "Response must be a dictionary"
 
         # Check for standard fields
         if "success" in response:
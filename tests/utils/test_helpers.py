@@ -5,9 +5,12 @@ Test utilities and helper functions for n8n Visual Workflow Builder tests.
 import asyncio
 import time
 import json
+from collections.abc import Mapping
 from typing import Dict, Any, List, Optional
 from unittest.mock import Mock, AsyncMock
 
+from tests.fixtures.frozen import thaw
+
 
 class TestDataGenerator:
     """Generate test data for various scenarios."""
@@ -191,15 +194,15 @@ class ValidationHelpers:
         """Assert workflow has valid structure."""
         assert "nodes" in workflow
         assert "connections" in workflow
-        assert isinstance(workflow["nodes"], list)
-        assert isinstance(workflow["connections"], list)
+        assert isinstance(workflow["nodes"], (list, tuple))
+        assert isinstance(workflow["connections"], (list, tuple))
 
         # Check nodes have required fields
         for node in workflow["nodes"]:
             assert "id" in node
             assert "type" in node
             assert "position" in node
-            assert isinstance(node["position"], dict)
+            assert isinstance(node["position"], Mapping)
             assert "x" in node["position"]
             assert "y" in node["position"]
 
@@ -229,9 +232,9 @@ class ValidationHelpers:
         assert "edges" in canvas
         assert "viewport" in canvas
 
-        assert isinstance(canvas["nodes"], list)
-        assert isinstance(canvas["edges"], list)
-        assert isinstance(canvas["viewport"], dict)
+        assert isinstance(canvas["nodes"], (list, tuple))
+        assert isinstance(canvas["edges"], (list, tuple))
+        assert isinstance(canvas["viewport"], Mapping)
 
         # Check viewport fields
         assert "x" in canvas["viewport"]
@@ -292,9 +295,9 @@ class DataComparisonHelpers:
             "connections": {"added": [], "removed": [], "modified": []}
         }
 
-        # Compare nodes
-        nodes1 = {node["id"]: node for node in workflow1.get("nodes", [])}
-        nodes2 = {node["id"]: node for node in workflow2.get("nodes", [])}
+        # Compare nodes (thawed, so frozen fixture constants match plain dicts/lists)
+        nodes1 = {node["id"]: node for node in thaw(workflow1).get("nodes", [])}
+        nodes2 = {node["id"]: node for node in thaw(workflow2).get("nodes", [])}
 
         for node_id in nodes1:
             if node_id not in nodes2:
@@ -313,7 +316,8 @@ class DataComparisonHelpers:
         """Assert two workflows are equal (ignoring metadata)."""
         def normalize_workflow(workflow):
             """Normalize workflow for comparison."""
-            normalized = json.loads(json.dumps(workflow))
+            # thaw() turns frozen fixture constants back into plain dicts/lists
+            normalized = json.loads(json.dumps(thaw(workflow)))
             # Remove metadata that shouldn't affect equality
             for node in normalized.get("nodes", []):
                 node.pop("data", None)